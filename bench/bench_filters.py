@@ -0,0 +1,72 @@
+# Integer EWMA vs the windowed averages: step response, noise and per-sample cost
+# The EWMAs settle slower, which is why the MAXPRESSURE/NOPRESSURE checks keep the SMAs.  Correctness is in tests/test_filters.py
+# Run from repo root:  python bench/bench_filters.py
+
+import sys
+import random
+sys.path.insert(0, "lib")
+
+from filters import EWMA, shift_for_window
+from benchutil import clock
+
+WINDOWS = (3, 7, 30)                # FAST_AVG_COUNT, HI_FREQ_AVG_COUNT, AVG_KPA_COUNT
+SAMPLES = 5000
+
+def sma(xs, n):
+    tail = xs[-n:]
+    return sum(tail) / len(tail)
+
+def settle_time(fn, target, tol):
+    """Samples after a 0 -> target step until the output stays within tol of target"""
+    last_out = 0
+    for i in range(200):
+        if abs(fn(i) - target) > tol:
+            last_out = i + 1
+    return last_out
+
+def compare():
+    for n in WINDOWS:
+        shift = shift_for_window(n)
+        xs = [400 + int(random.gauss(0, 8)) for _ in range(SAMPLES)]
+        mean = sum(xs) / len(xs)
+        # noise out of each, over the same data
+        e2 = EWMA(shift)
+        sq_e = sq_s = 0.0
+        for i, x in enumerate(xs):
+            e2.add(x)
+            if i >= 100:
+                sq_e += (e2.value() - mean) ** 2
+                sq_s += (sma(xs[:i + 1], n) - mean) ** 2
+        k = len(xs) - 100
+        print(f"window {n:2} -> shift {shift}  output SD: SMA {(sq_s / k) ** 0.5:4.2f}  EWMA {(sq_e / k) ** 0.5:4.2f}")
+
+        step = [0] * 50 + [400] * 200
+        e3 = EWMA(shift)
+        outs = []
+        for x in step:
+            e3.add(x)
+            outs.append(e3.value())
+        t_e = settle_time(lambda i: outs[50 + i], 400, 4)
+        t_s = settle_time(lambda i: sma(step[:51 + i], n), 400, 4)
+        print(f"          step settles within 1%: SMA {t_s:3} samples  EWMA {t_e:3} samples")
+
+def timing():
+    xs = [400 + random.randint(-8, 8) for _ in range(SAMPLES)]
+    e = EWMA(4)
+    t = clock()
+    for x in xs:
+        e.add(x)
+    t_e = (clock() - t) / SAMPLES * 1e6
+    ring = [0] * 1024
+    t = clock()
+    for i, x in enumerate(xs):
+        ring[i % 1024] = x
+        s = 0
+        for k in range(30):
+            s += ring[(i - k) % 1024]
+    t_s = (clock() - t) / SAMPLES * 1e6
+    print(f"per sample: 30-window rescan {t_s:5.2f} us  EWMA {t_e:5.2f} us")
+
+if __name__ == "__main__":
+    compare()
+    timing()
@@ -0,0 +1,28 @@
+# Timing: mean_stddev fixed_point (integer accumulating) vs the float version... error bounds are in tests/test_fixedpoint.py
+# Run from repo root:  python bench/bench_fixedpoint.py
+# Under the micropython unix port it also reports heap bytes allocated per call... the point of the integer path.
+
+import sys
+import random
+sys.path.insert(0, "lib")
+
+from stats import mean_stddev
+from benchutil import per_call, heap_per_call
+
+RINGLEN = 1024
+SIZES   = (12, 60, 128)
+REPEATS = 200
+
+def main():
+    y = [300 + random.randint(-5, 5) for _ in range(RINGLEN)]
+    for n in SIZES:
+        args = (y, n, 100, RINGLEN)
+        t_f = per_call(REPEATS, mean_stddev, *args)
+        t_i = per_call(REPEATS, mean_stddev, *args, fixed_point=True)
+        h_f = heap_per_call(20, mean_stddev, *args)
+        h_i = heap_per_call(20, mean_stddev, *args, fixed_point=True)
+        heap = f"  heap {h_f:7.0f} -> {h_i:5.0f} bytes/call" if h_f is not None else ""
+        print(f"n={n:4}  float {t_f:7.1f} us  fixed {t_i:7.1f} us{heap}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Host benchmark: single-pass linear_regression vs the old three-pass version
+# Run from repo root:  python bench/bench_linreg.py
+# Equivalence with the reference (wrapped, dummy and real x) is checked in tests/test_linreg.py
+
+import sys
+import random
+sys.path.insert(0, "lib")
+
+from stats import linear_regression
+from benchutil import per_call
+from reference import linear_regression_ref
+
+SIZES   = (12, 60, 128, 512)
+RINGLEN = 1024
+REPEATS = 200
+
+def main():
+    y = [int(350 - i * 0.05 + random.gauss(0, 4)) for i in range(RINGLEN)]     # 1 Hz kPa, noisy with a slow trend
+    x = list(range(RINGLEN))
+    for dummy in (True, False):
+        print(f"dummy_x={dummy}")
+        for n in SIZES:
+            old = per_call(REPEATS, linear_regression_ref, x, y, n, 100, RINGLEN, dummy)
+            new = per_call(REPEATS, linear_regression, x, y, n, 100, RINGLEN, dummy)
+            print(f"  n={n:4}  old {old:8.1f} us  new {new:8.1f} us  x{old / new:4.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# secs_to_localtime: cached per-year DST boundaries vs rebuilding them with mktime on every call
+# Run from repo root:  python bench/bench_localtime.py
+# Boundaries are worked out in UTC, as on the Pico... run the host with TZ=UTC for the same answers.
+# Equivalence with the old version is checked in tests/test_localtime.py, the now_time_* memo in tests/test_now_memo.py
+
+import os
+import sys
+import time
+sys.path.insert(0, "lib")
+
+if hasattr(time, "tzset"):
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+
+from utils import secs_to_localtime, now_time_long, format_time_long
+from benchutil import clock, per_call
+from reference import secs_to_localtime_ref
+
+REPEATS = 5000
+
+def per_second(fn, secs):
+    """A fresh second each call, so no memo along the way can help"""
+    t = clock()
+    for i in range(REPEATS):
+        fn(secs + i)
+    return (clock() - t) / REPEATS * 1e6
+
+def now_long_ref():
+    """now_time_long before the per-second memo"""
+    return format_time_long(secs_to_localtime_ref(time.time()))
+
+if __name__ == "__main__":
+    now = int(time.time())
+    old = per_second(secs_to_localtime_ref, now)
+    new = per_second(secs_to_localtime, now)
+    print(f"per call: old {old:6.2f} us  cached {new:6.2f} us  x{old / new:4.1f}")
+    old = per_call(REPEATS, now_long_ref)
+    new = per_call(REPEATS, now_time_long)
+    print(f"now_time_long: old {old:6.2f} us  memoised {new:6.2f} us  x{old / new:4.1f}")
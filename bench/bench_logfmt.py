@@ -0,0 +1,36 @@
+# LineFormatter vs f-strings for the per-sample log lines: per-line cost and heap use
+# Run from repo root:  python bench/bench_logfmt.py
+# Under the micropython unix port it also reports heap bytes allocated per line... the point of the exercise.
+# On CPython the f-strings win on time (native code); same text either way, see tests/test_logfmt.py
+
+import sys
+sys.path.insert(0, "lib")
+
+from utils import LineFormatter, now_time_long
+from benchutil import per_call, heap_per_call
+
+REPEATS = 2000
+
+def fstring_hf(bpp, avg_x10, err_x10):
+    return f"{now_time_long()} {bpp:>3} {avg_x10 / 10:.1f} {err_x10 / 10:.1f}\n"
+
+def fmt_hf(fmt, bpp, avg_x10, err_x10):
+    return fmt.reset().put_now_long().put_byte(32).put_int(bpp, 3).put_byte(32).put_fixed(avg_x10, 1).put_byte(32).put_fixed(err_x10, 1).end()
+
+def fstring_pp(on):
+    return f"{now_time_long()} {'ON' if on else 'OFF'}\n"
+
+def fmt_pp(fmt, on):
+    return fmt.reset().put_now_long().put_byte(32).put_bytes(b'ON' if on else b'OFF').end()
+
+def main():
+    fmt = LineFormatter(48)
+    for name, old, new in (("hf", lambda: fstring_hf(352, 3514, 3391), lambda: fmt_hf(fmt, 352, 3514, 3391)),
+                           ("pp", lambda: fstring_pp(True), lambda: fmt_pp(fmt, True))):
+        t_old, t_new = per_call(REPEATS, old), per_call(REPEATS, new)
+        h_old, h_new = heap_per_call(100, old), heap_per_call(100, new)
+        heap = f"  heap {h_old:5.0f} -> {h_new:3.0f} bytes/line" if h_old is not None else ""
+        print(f"{name}  f-string {t_old:6.2f} us  formatter {t_new:6.2f} us{heap}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Host benchmark: one-pass Welford mean_stddev vs the old two-pass version
+# Run from repo root:  python bench/bench_meanstd.py
+# Results and element read counts are checked in tests/test_meanstd.py
+
+import sys
+import random
+sys.path.insert(0, "lib")
+
+import stats
+from stats import mean_stddev, tuple_value
+from benchutil import per_call
+from reference import mean_stddev_ref
+
+RINGLEN = 1024
+REPEATS = 300
+
+def main():
+    saved = stats.VECTOR_MIN_STDDEV
+    stats.VECTOR_MIN_STDDEV = 1 << 30                      # loop path only... the vector path has its own bench
+    vals = [random.randint(0, 700) for _ in range(RINGLEN)]
+    tups = [(i, v) for i, v in enumerate(vals)]
+    for n in (12, 60, 128):
+        print(f"n={n:4}  scalar old {per_call(REPEATS, mean_stddev_ref, vals, n, 5, RINGLEN):6.1f} us  new {per_call(REPEATS, mean_stddev, vals, n, 5, RINGLEN):6.1f} us"
+              f"   tuple old {per_call(REPEATS, mean_stddev_ref, tups, n, 5, RINGLEN, tuple_value):6.1f} us  new {per_call(REPEATS, mean_stddev, tups, n, 5, RINGLEN):6.1f} us")
+    stats.VECTOR_MIN_STDDEV = saved
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Host benchmark: list-of-tuples RingBuffer vs array-backed NumericRingBuffer
+# Run from repo root:  python bench/bench_ringbuffer.py
+# Also runs under the micropython unix port, where it reports heap bytes allocated per insert.
+
+import sys
+sys.path.insert(0, "lib")
+
+from ringbuffer import RingBuffer, NumericRingBuffer
+from benchutil import clock, heap_per_call
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+import gc
+
+SIZES   = (12, 128, 1024)
+INSERTS = 20000
+T0      = 1762484000
+
+def fill(ring, n):
+    for i in range(n):
+        ring.add(300 + (i % 400), T0 + i)
+
+def throughput(make, size):
+    ring = make(size)
+    fill(ring, size)                    # start from a full ring... steady state
+    t = clock()
+    fill(ring, INSERTS)
+    dt = clock() - t
+    return INSERTS / dt
+
+def footprint(make, size):
+    """CPython: bytes retained by a full ring"""
+    gc.collect()
+    tracemalloc.start()
+    ring = make(size)
+    fill(ring, size * 2)
+    cur, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ring
+    return cur
+
+def heap_per_insert(make, size):
+    """MicroPython: heap bytes allocated per add() once the ring is full"""
+    ring = make(size)
+    fill(ring, size)
+    return heap_per_call(1000, ring.add, 350, T0)
+
+def main():
+    makers = (("list/tuple", lambda n: RingBuffer(n)),
+              ("array     ", lambda n: NumericRingBuffer(n)))
+    for size in SIZES:
+        print(f"size {size}")
+        for name, make in makers:
+            rate = throughput(make, size)
+            if tracemalloc is not None:
+                mem = f"{footprint(make, size):7} bytes retained"
+            else:
+                mem = f"{heap_per_insert(make, size):6.1f} bytes/insert"
+            print(f"  {name} {rate:10.0f} inserts/s  {mem}")
+
+if __name__ == "__main__":
+    main()
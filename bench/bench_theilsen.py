@@ -0,0 +1,31 @@
+# Theil-Sen vs least squares for the depth residual SD check: cost per call
+# Run from repo root:  python bench/bench_theilsen.py
+# Theil-Sen is O(n² log n)... the point is to show where that stops being cheap enough for every main loop.
+# Robustness to a glitch is checked in tests/test_theilsen.py
+
+import sys
+import random
+sys.path.insert(0, "lib")
+
+from stats import linear_regression, theil_sen
+from benchutil import per_call
+
+DEPTHRINGSIZE = 12
+SIZES   = (DEPTHRINGSIZE, 24, 60, 120)
+REPEATS = 100
+
+def depth_window(n):
+    """Tank filling at ~0.7 mm/s, 15 s apart, ±1 mm noise"""
+    x = [15 * i + random.randint(0, 1) for i in range(n)]
+    y = [1000 + int(0.7 * x[i]) + random.randint(-1, 1) for i in range(n)]
+    return x, y
+
+def main():
+    for n in SIZES:
+        x, y = depth_window(n)
+        t_ls = per_call(REPEATS, linear_regression, x, y, n, 0, n, False)
+        t_ts = per_call(REPEATS, theil_sen, x, y, n, 0, n, False)
+        print(f"  n={n:4}  pairs {n * (n - 1) // 2:5}  linreg {t_ls:8.1f} us  theil_sen {t_ts:8.1f} us  x{t_ts / t_ls:5.1f}")
+
+if __name__ == "__main__":
+    main()
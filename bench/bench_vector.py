@@ -0,0 +1,51 @@
+# Host benchmark: ulab/numpy vectorised stats kernels vs the pure-Python loops, to find the crossovers (stats.VECTOR_MIN_*)
+# Run from repo root:  python bench/bench_vector.py        (needs numpy on the host... or ulab in the micropython build)
+# Vector and loop results are checked against each other in tests/test_vector.py
+
+import sys
+import random
+sys.path.insert(0, "lib")
+
+import stats
+from stats import mean_stddev, linear_regression, ring_mean
+import benchutil
+
+RINGLEN = 1024
+SIZES   = (4, 8, 16, 32, 48, 64, 128, 256, 512, 1024)
+REPEATS = 300
+
+THRESHOLDS = ("VECTOR_MIN_MEAN", "VECTOR_MIN_STDDEV", "VECTOR_MIN_LINREG")
+
+def set_thresholds(n):
+    for name in THRESHOLDS:
+        setattr(stats, name, n)
+
+def per_call(vector, fn, *args):
+    set_thresholds(0 if vector else 1 << 30)
+    return benchutil.per_call(REPEATS, fn, *args)
+
+def main():
+    if stats.np is None:
+        print("no ulab/numpy... stats runs the pure-Python loops only")
+        return
+    saved = [getattr(stats, name) for name in THRESHOLDS]
+    y = [300 + random.randint(-5, 5) for _ in range(RINGLEN)]
+    x = list(range(RINGLEN))
+    kernels = (("ring_mean  ", ring_mean, lambda n: (y, n, 100, RINGLEN)),
+               ("mean_stddev", mean_stddev, lambda n: (y, n, 100, RINGLEN)),
+               ("linreg     ", linear_regression, lambda n: (x, y, n, 100, RINGLEN, True)))
+    for name, fn, args in kernels:
+        crossover = None
+        print(name)
+        for n in SIZES:
+            loop = per_call(False, fn, *args(n))
+            vec  = per_call(True, fn, *args(n))
+            if crossover is None and vec < loop:
+                crossover = n
+            print(f"  n={n:5}  loop {loop:8.1f} us  vector {vec:8.1f} us")
+        print(f"  crossover at n ~ {crossover}")
+    for name, v in zip(THRESHOLDS, saved):
+        setattr(stats, name, v)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# Timing and heap helpers shared by the bench scripts... CPython on the host, or the micropython unix port
+# The correctness checks live in tests/, these scripts only measure.
+
+import gc
+import time
+
+def clock():
+    """Seconds, as a float... perf_counter on CPython, ticks_us under micropython"""
+    return time.perf_counter() if hasattr(time, "perf_counter") else time.ticks_us() / 1e6
+
+def per_call(repeats, fn, *args, **kw):
+    """Mean microseconds per fn(*args, **kw), over repeats calls"""
+    t = clock()
+    for _ in range(repeats):
+        fn(*args, **kw)
+    return (clock() - t) / repeats * 1e6
+
+def heap_per_call(repeats, fn, *args, **kw):
+    """Heap bytes allocated per call, with the collector off... None on CPython, which has no gc.mem_alloc"""
+    if not hasattr(gc, "mem_alloc"):
+        return None
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    for _ in range(repeats):
+        fn(*args, **kw)
+    after = gc.mem_alloc()
+    gc.enable()
+    return (after - before) / repeats
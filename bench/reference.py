@@ -0,0 +1,64 @@
+# The implementations the optimised kernels replaced... the benches time them, tests/ checks the new code against them
+
+import math
+import time
+
+def linear_regression_ref(x, y, count, startidx, ringlen, dummy_x):
+    """linear_regression as it was, three passes... kept verbatim in behaviour"""
+    ring_xbar = ring_ybar = 0.0
+    for i in range(count):
+        mod_idx = (startidx - 1 - i) % ringlen
+        xi = count - i if dummy_x else x[mod_idx]
+        ring_xbar += xi
+        ring_ybar += y[mod_idx]
+    x_mean = ring_xbar / count
+    y_mean = ring_ybar / count
+
+    sum_xy = sum_xx = sum_yy = 0.0
+    for i in range(count):
+        mod_idx = (startidx - 1 - i) % ringlen
+        xi = count - i if dummy_x else x[mod_idx]
+        dx = xi - x_mean
+        dy = y[mod_idx] - y_mean
+        sum_xy += dx * dy
+        sum_xx += dx * dx
+        sum_yy += dy * dy
+    slope = sum_xy / sum_xx
+    intercept = y_mean - slope * x_mean
+
+    ss_reg = ss_tot = 0.0
+    for i in range(count):
+        mod_idx = (startidx - 1 - i) % ringlen
+        xi = count - i if dummy_x else x[mod_idx]
+        y_pred = slope * xi + intercept
+        ss_reg += (y_pred - y_mean) ** 2
+        ss_tot += (y[mod_idx] - y_mean) ** 2
+    ss_dev    = ss_tot - ss_reg
+    r_squared = (ss_reg / ss_tot) if ss_tot != 0 else 0
+    std_dev   = math.sqrt(sum_yy / (count-1))
+    sd_resids = math.sqrt(max(ss_dev, 0) / (count-1))
+    return slope, intercept, std_dev, sd_resids, r_squared
+
+def mean_stddev_ref(buff, count, startidx, ringlen, key=lambda v: v):
+    """mean_stddev as it was, two passes"""
+    s = 0.0
+    for i in range(count):
+        s += key(buff[(startidx - 1 - i) % ringlen])
+    mean = s / count
+    ss = 0.0
+    for i in range(count):
+        d = key(buff[(startidx - 1 - i) % ringlen]) - mean
+        ss += d * d
+    return mean, math.sqrt(ss / (count - 1))
+
+def secs_to_localtime_ref(secs):
+    """secs_to_localtime as it was: two localtime and two mktime calls, every time"""
+    tupltime = time.localtime(secs)
+    year = tupltime[0]
+    DST_end = time.mktime((year, 4, (7 - (int(5 * year / 4 + 4)) % 7), 2, 0, 0, 0, 0, 0))
+    DST_start = time.mktime((year, 10, (7 - (int(year * 5 / 4 + 5)) % 7), 2, 0, 0, 0, 0, 0))
+    if DST_end < secs < DST_start:
+        adj_time = time.localtime(secs + int(9.5 * 3600))
+    else:
+        adj_time = time.localtime(secs + int(10.5 * 3600))
+    return adj_time
@@ -50,6 +50,8 @@ class MenuNavigator:
     KPARING         = 'kpa'
     DEPTHRING       = 'depth'
     PPRING          = 'house'
+    KPAHIST         = 'kpa_hist'        # archive tiers... (period start, low, mean, high)
+    DEPTHHIST       = 'depth_hist'
 
     def __init__(self, menu, dev2:RGB1602): #, dev4:I2cLcd):
         self.menu = menu
@@ -67,7 +69,9 @@ class MenuNavigator:
             MenuNavigator.KPARING:      {'buffer': None, 'index': 0},
             MenuNavigator.ERRORRING:    {'buffer': None, 'index': 0},
             MenuNavigator.PPRING:       {'buffer': None, 'index': 0},
-            MenuNavigator.DEPTHRING:    {'buffer': None, 'index': 0}      # added depth for consistency with other data structure 19/9/25
+            MenuNavigator.DEPTHRING:    {'buffer': None, 'index': 0},     # added depth for consistency with other data structure 19/9/25
+            MenuNavigator.KPAHIST:      {'buffer': None, 'index': 0},     # set when shown... the archive picks which tier
+            MenuNavigator.DEPTHHIST:    {'buffer': None, 'index': 0}
         }
 
         self.programlist = None     # no change to these ... yet
@@ -77,21 +81,26 @@ class MenuNavigator:
         self.display_current_item()
 
         self.errors = TankError()
-        self.displaylist = None     # hopefully, I can use this to consolidate my next/prev view_* code
+        self.displayring = None     # ring being viewed... a fresh window is taken from it for every render
         self.display_navindex = 0
         self.displaylistname = ""
 
+    def _display_window(self):
+        """Newest-first view of the ring being shown.  Taken afresh each time: a window isn't valid across add()s"""
+        return self.displayring.last() if self.displayring is not None else None
+
     def _handle_ring_view(self, forward=True):
         """Handle viewing ring buffer contents"""
-        if self.displaylist is None:
+        displaylist = self._display_window()
+        if displaylist is None:
             return f"{self.displaylistname}list: None"
         
-        if not self.displaylist:
+        if not displaylist:
             return f"{self.displaylistname}list: Empty"
             
         direction = 1 if forward else -1
-        self.display_navindex = (self.display_navindex + direction) % len(self.displaylist)
-        hist_str = self.displaylist[self.display_navindex]      # moved to AFTER index update... 22/5/25
+        self.display_navindex = (self.display_navindex + direction) % len(displaylist)
+        hist_str = displaylist[self.display_navindex]      # moved to AFTER index update... 22/5/25
         return hist_str                                         # now consistent with handle_list_view
 
     def _format_display_entry(self, hist_str):
@@ -106,13 +115,16 @@ class MenuNavigator:
         if self.mode == MenuNavigator.VIEWRING:
             datestamp = format_secs_short(int(hist_str[0]))
             if self.displaylistname == "errors":
-                tmp     = hist_str[1]
-                if type(tmp) == str:
-                    tmp = int(tmp.split(" ")[0])
-                log_txt = self.errors.get_code(tmp)                 # needed since I added duplicate count after code
+                log_txt = self.errors.get_code(hist_str[1])
+            elif len(hist_str) == 4:                                # archive tier summary
+                log_txt = f'{hist_str[1]}/{hist_str[2]}/{hist_str[3]}'
             else:
                 log_txt = hist_str[1]
-            if type(log_txt) == str: log_txt = log_txt[:16]         # trim to 16 chars
+            reps = hist_str[2] if len(hist_str) == 3 else 1         # duplicate-detecting rings carry a repeat count
+            if reps > 1:
+                rep_txt = f' x{reps}'
+                log_txt = f'{str(log_txt)[:16 - len(rep_txt)]}{rep_txt}'
+            elif type(log_txt) == str: log_txt = log_txt[:16]       # trim to 16 chars
         elif self.mode == MenuNavigator.VIEWPROG:
             datestamp   = hist_str[0]
             prog        = hist_str[1]
@@ -125,13 +137,13 @@ class MenuNavigator:
         return datestamp, log_txt
 
     def set_display_list(self, list_name):
-        """Set the current display list and name"""
-        self.displaylist = self.ring_buffers[list_name]["buffer"]
+        """Set the current display list and name.  Ring views are newest first, so goto_first shows the latest entry"""
+        self.displayring = self.ring_buffers[list_name]["buffer"]
         self.displaylistname = list_name
         self.display_navindex = 0
 
-    def set_buffer(self, bufname, buff):
-        self.ring_buffers[bufname]['buffer'] = buff
+    def set_buffer(self, bufname, ring):
+        self.ring_buffers[bufname]['buffer'] = ring       # the RingBuffer itself... _display_window() takes a fresh window from it on each render
 
     def _update_display(self, datestamp, log_txt):
         """Update LCD display with formatted entries"""
@@ -247,11 +259,12 @@ class MenuNavigator:
     def goto_position(self, first=True):
         hist_str = None
         if self.mode == MenuNavigator.VIEWRING:
-            if self.displaylist is not None:
-                if len(self.displaylist) > 0:
-                    pos = 0 if first else len(self.displaylist) - 1     # TODO woul be nice to have a go_to_current, but will need context
+            displaylist = self._display_window()
+            if displaylist is not None:
+                if len(displaylist) > 0:
+                    pos = 0 if first else len(displaylist) - 1     # TODO woul be nice to have a go_to_current, but will need context
                     self.display_navindex = pos
-                    hist_str = self.displaylist[pos]
+                    hist_str = displaylist[pos]
         elif self.mode == MenuNavigator.VIEWPROG:
             if self.programlist is not None:
                 if len(self.programlist) > 0:
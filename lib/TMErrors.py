@@ -20,6 +20,7 @@ class TankError:
     HI_VAR_DIST         = 17
     PUMP_OFF_FAILED     = 18
     PUMP_ON_FAILED      = 19
+    KPA_OSCILLATION     = 20
     MAX_REPEAT_EVENT    = 100
 
     def __init__(self):
@@ -45,6 +46,7 @@ class TankError:
             self.HI_VAR_DIST:       ("XVD",  "Hi D Variance"),
             self.PUMP_OFF_FAILED:   ("OFFF", "PumpOFF failed"),
             self.PUMP_ON_FAILED:    ("ONF",  "PumpON failed"),
+            self.KPA_OSCILLATION:   ("OSC",  "kPa oscillating"),
             self.MAX_REPEAT_EVENT:  ("XREP", "Max repeated events")
         }
     
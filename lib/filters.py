@@ -0,0 +1,67 @@
+# Integer low-pass filters... state is a few ints, one update per sample, no ring rescans
+
+FRAC_BITS = 8               # fixed point: state held as value << FRAC_BITS
+
+def shift_for_window(n:int)->int:
+    """
+    Smallest shift whose EWMA is at least as smooth as an n-sample moving average.
+    alpha = 2^-shift matches an SMA of 2/alpha - 1 samples, ie 2^(shift+1) - 1:  3 -> 1, 7 -> 2, 30 -> 4
+    """
+    shift = 0
+    while (2 << shift) - 1 < n:
+        shift += 1
+    return shift
+
+class EWMA:
+    """
+    Single-pole low-pass, y += (x - y) / 2^shift, in integer fixed point.  stages > 1 cascades identical poles
+    in series... steeper roll-off for the same shift, at the cost of more lag.
+
+    Starts as a running mean until 2^shift samples are in (alpha = 1/n), so it isn't dragged towards zero
+    after reset()... then settles to the fixed alpha.
+
+    Args:
+        shift:      time constant, as a power of two.  See shift_for_window()
+        stages:     poles in series
+    """
+    def __init__(self, shift:int, stages:int=1, frac_bits:int=FRAC_BITS):
+        self.shift = shift
+        self.frac_bits = frac_bits
+        self.state = [0] * stages
+        self.count = 0                      # samples since reset, stops at 2^shift
+        self._round = (1 << shift) >> 1
+
+    def reset(self)->None:
+        for i in range(len(self.state)):
+            self.state[i] = 0
+        self.count = 0
+
+    def add(self, x:int)->None:
+        """x should be an int... kPa, mm"""
+        v = x << self.frac_bits
+        state = self.state
+        n = self.count
+        if n < (1 << self.shift):           # still warming up... running mean
+            n += 1
+            self.count = n
+            for i in range(len(state)):
+                state[i] += (v - state[i]) // n
+                v = state[i]
+            return
+        sh = self.shift
+        rnd = self._round
+        for i in range(len(state)):
+            state[i] += (v - state[i] + rnd) >> sh
+            v = state[i]
+
+    def value(self)->float:
+        """Current output, 0 if nothing added since reset"""
+        return self.state[-1] / (1 << self.frac_bits)
+
+    def scaled(self, scale:int)->int:
+        """Output times scale, rounded... eg scale=10 for tenths, to log without making a float"""
+        return (self.state[-1] * scale + (1 << (self.frac_bits - 1))) >> self.frac_bits
+
+    def int_value(self)->int:
+        """Current output rounded to the nearest int... no floats"""
+        return (self.state[-1] + (1 << (self.frac_bits - 1))) >> self.frac_bits
@@ -0,0 +1,51 @@
+# Monotonic deque... sliding-window max/min.  Its own module so ringbuffer doesn't pull in stats (and its numpy/ulab probe)
+
+class MonotonicDeque:
+    """
+    Sliding-window max (or min) in O(1) amortised per sample.
+    Holds (seq, value) pairs whose values are monotonic front to back, so the front is always the extreme.
+    Fixed capacity circular storage... nothing allocated per push.
+
+    Args:
+        capacity: longest window that will be tracked
+        largest:  True tracks the max, False the min
+    """
+    def __init__(self, capacity:int, largest:bool=True):
+        self.capacity = capacity + 1        # one spare... push happens before the caller expires
+        self.seqs = [0] * self.capacity
+        self.vals = [0] * self.capacity
+        self.largest = largest
+        self.head = 0
+        self.length = 0
+
+    def clear(self)->None:
+        self.head = 0
+        self.length = 0
+
+    def push(self, seq:int, value)->None:
+        """Add the sample numbered seq.  Anything at the back it dominates can never be the extreme again"""
+        cap = self.capacity
+        vals = self.vals
+        n = self.length
+        while n > 0:
+            back = vals[(self.head + n - 1) % cap]
+            if (back > value) if self.largest else (back < value):
+                break
+            n -= 1
+        if n == cap:                        # shouldn't happen if expire() is kept up... drop the front
+            self.head = (self.head + 1) % cap
+            n -= 1
+        slot = (self.head + n) % cap
+        self.seqs[slot] = seq
+        vals[slot] = value
+        self.length = n + 1
+
+    def expire(self, first_seq:int)->None:
+        """Drop everything older than sample first_seq"""
+        while self.length > 0 and self.seqs[self.head] < first_seq:
+            self.head = (self.head + 1) % self.capacity
+            self.length -= 1
+
+    def peek(self):
+        """Current extreme, or None if empty"""
+        return self.vals[self.head] if self.length > 0 else None
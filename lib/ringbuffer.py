@@ -1,7 +1,11 @@
 import time
+import math
+import struct
+from array import array
+from monoqueue import MonotonicDeque
 
 class RingBuffer:
-    def __init__(self, size, time_formatter=None, short_time_formatter=None, value_formatter=None, logger=print):
+    def __init__(self, size, time_formatter=None, short_time_formatter=None, value_formatter=None, logger=print, aggregate=False, resum_every=None):
         self.buffer = []
         self.size = size
         self.index = -1
@@ -9,6 +13,15 @@ class RingBuffer:
         self.short_time_formatter = short_time_formatter
         self.value_formatter = value_formatter
         self.logger = logger  # Can be print function or file object's write method
+        self.aggregate = aggregate      # numeric values only... keeps running sum/sumsq and min/max so reads are O(1)
+        if aggregate:
+            self.resum_every = size if resum_every is None else resum_every    # bounds float drift, costs O(n) every resum_every adds
+            self._maxq = MonotonicDeque(size, True)
+            self._minq = MonotonicDeque(size, False)
+            self._sum = 0
+            self._sumsq = 0
+            self._seq = 0               # number of adds so far... numbers samples for the min/max deques
+            self._since_resum = 0
     
     def add(self, message, timestamp=None):
         """Basic add - no duplicate detection"""
@@ -16,36 +29,226 @@ class RingBuffer:
         if not self.buffer:
             self.buffer.append((ts, message))
             self.index = 0
+            if self.aggregate: self._fold(message, None)
             return
             
         if len(self.buffer) < self.size:
             self.buffer.append((ts, message))
             self.index = len(self.buffer) - 1
+            if self.aggregate: self._fold(message, None)
         else:
             self.index = (self.index + 1) % self.size
+            evicted = self.buffer[self.index][1]
             self.buffer[self.index] = (ts, message)
-            
-    def dump(self, short_time=False):
-        if not self.buffer:
+            if self.aggregate: self._fold(message, evicted)
+
+    def _fold(self, value, evicted):
+        """Bring the running aggregates up to date after an add.  evicted is the value just overwritten, or None"""
+        self._sum += value
+        self._sumsq += value * value
+        if evicted is not None:
+            self._sum -= evicted
+            self._sumsq -= evicted * evicted
+        seq = self._seq
+        first = seq - self.size + 1             # oldest sample still in the ring
+        self._maxq.expire(first)
+        self._minq.expire(first)
+        self._maxq.push(seq, value)
+        self._minq.push(seq, value)
+        self._seq = seq + 1
+        self._since_resum += 1
+        if self._since_resum >= self.resum_every:
+            self.resum()
+
+    def resum(self):
+        """Rebuild the aggregates from what's actually in the ring... throws away any accumulated drift"""
+        self._need_aggregate("resum")
+        s = 0
+        ss = 0
+        self._maxq.clear()
+        self._minq.clear()
+        seq = self._seq - len(self)
+        for v in self.window().values():
+            s += v
+            ss += v * v
+            self._maxq.push(seq, v)
+            self._minq.push(seq, v)
+            seq += 1
+        self._sum = s
+        self._sumsq = ss
+        self._since_resum = 0
+
+    def _need_aggregate(self, what):
+        if not self.aggregate:
+            raise ValueError(f"RingBuffer.{what}() needs aggregate=True")
+
+    def mean(self):
+        """O(1) in aggregate mode.  0 if empty"""
+        self._need_aggregate("mean")
+        n = len(self)
+        return self._sum / n if n > 0 else 0
+
+    def variance(self):
+        """Sample variance, O(1) in aggregate mode.  0 if fewer than 2 entries"""
+        self._need_aggregate("variance")
+        n = len(self)
+        if n < 2:
+            return 0
+        v = (self._sumsq - self._sum * self._sum / n) / (n - 1)
+        return v if v > 0 else 0                # cancellation can push it fractionally negative
+
+    def stddev(self):
+        return math.sqrt(self.variance())
+
+    def min(self):
+        """Smallest value in the ring, None if empty"""
+        self._need_aggregate("min")
+        return self._minq.peek()
+
+    def max(self):
+        """Largest value in the ring, None if empty"""
+        self._need_aggregate("max")
+        return self._maxq.peek()
+
+    def __len__(self):
+        return len(self.buffer)
+
+# Element access by PHYSICAL slot... overridden by the array-backed ring so cursors never need the tuples
+    def _entry(self, slot):
+        return self.buffer[slot]
+
+    def _time_at(self, slot):
+        return self.buffer[slot][0]
+
+    def _value_at(self, slot):
+        return self.buffer[slot][1]
+
+    def _count_at(self, slot):
+        """Times the entry in slot was seen... always 1 unless the ring folds duplicates"""
+        return 1
+
+    def latest(self):
+        """Newest entry, or None if empty"""
+        return self._entry(self.index) if self.index > -1 else None
+
+    def window(self, n=None):
+        """Cursor over the most recent n entries (all if None), oldest first"""
+        entries = len(self)
+        if n is None or n > entries:
+            n = entries
+        return RingWindow(self, self.index - n + 1, n, 1, entries)
+
+    def last(self, n=None):
+        """Cursor over the most recent n entries (all if None), newest first"""
+        entries = len(self)
+        if n is None or n > entries:
+            n = entries
+        return RingWindow(self, self.index, n, -1, entries)
+
+    def _bisect(self, ts, right=False):
+        """
+        Chronological position (0 == oldest) of the first entry with timestamp >= ts, or > ts if right.
+        Timestamps only ever increase, so binary search the rotated storage... O(log n)
+        """
+        entries = len(self)
+        oldest = self.index - entries + 1       # position k lives in slot (oldest + k) % entries
+        lo = 0
+        hi = entries
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            t = self._time_at((oldest + mid) % entries)
+            if t < ts or (right and t == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def since(self, ts):
+        """Cursor over entries with timestamp >= ts, oldest first"""
+        entries = len(self)
+        first = self._bisect(ts)
+        return RingWindow(self, self.index - entries + 1 + first, entries - first, 1, entries)
+
+    def between(self, t0, t1):
+        """Cursor over entries with t0 <= timestamp <= t1, oldest first"""
+        entries = len(self)
+        first = self._bisect(t0)
+        end   = self._bisect(t1, right=True)
+        return RingWindow(self, self.index - entries + 1 + first, max(end - first, 0), 1, entries)
+
+    def newest(self):
+        """Iterate all entries, newest first"""
+        return iter(self.last())
+
+    def oldest(self):
+        """Iterate all entries, oldest first"""
+        return iter(self.window())
+
+    _DUMP_CHUNK = 16                    # lines per logger call
+
+    def dump(self, short_time=False, binary=False):
+        """
+        Write every entry, newest first, to the logger.  Lines are joined and written _DUMP_CHUNK at a time,
+        not one logger call per entry.
+        binary: write the pack() bytes instead... the logger must then accept bytes (file.write does)
+        """
+        if len(self) == 0:
             self.logger("Buffer empty")
             return
+        if binary:
+            self.logger(self.pack())
+            return
         
         time_fmt = self.short_time_formatter if (short_time and self.short_time_formatter) else self.time_formatter
+        lines = []
     
-        entries = len(self.buffer)
-        current = self.index
+        recent = self.last()
         
-        for _ in range(entries):
-            entry = self.buffer[current]
-            if self.value_formatter:
-                tmp = entry[1]                          # Yuk.  This scrambled code is because I now overload the tuple 2nd elemnt
-                if type(tmp) == str:                    # error_ring has either an int... or an int followed by a repeat count string
-                    tmp = int(tmp.split(" ")[0])        # Maybe there's a better way to do this...
-                message = f"Log {current:2}: {time_fmt(entry[0])} {self.value_formatter(tmp)}\n"   # type: ignore
+        for k in range(len(recent)):
+            current = recent.slot(k)                    # physical slot... for the "Log nn" label
+            entry = self._entry(current)
+            value = self.value_formatter(entry[1]) if self.value_formatter else entry[1]
+            reps = self._count_at(current)
+            if reps > 1:
+                lines.append(f"Log {current:2}: {time_fmt(entry[0])} {value} (repeated x{reps})\n")    # type: ignore
             else:
-                message = f"Log {current:2}: {time_fmt(entry[0])} {entry[1]}\n"                         # type: ignore
-            self.logger(message)
-            current = (current - 1) % entries
+                lines.append(f"Log {current:2}: {time_fmt(entry[0])} {value}\n")                       # type: ignore
+            if len(lines) == RingBuffer._DUMP_CHUNK:
+                self.logger("".join(lines))
+                lines = []
+        if lines:
+            self.logger("".join(lines))
+
+# Binary form, for snapshots... entries oldest first: '<i' timestamp, then a tagged value (ints, floats or strings)
+    def pack(self):
+        """Entries as bytes, oldest first.  Restore with unpack()"""
+        out = bytearray(struct.pack('<H', len(self)))
+        win = self.window()
+        for k in range(len(win)):
+            self._pack_entry(out, win.slot(k))
+        return out
+
+    def _pack_entry(self, out, slot):
+        out.extend(struct.pack('<i', self._time_at(slot)))
+        _pack_value(out, self._value_at(slot))
+
+    def unpack(self, data, pos=0, apply=True):
+        """
+        Re-add the entries in data[pos:] as packed by pack().  Returns the position after them.
+        apply=False just parses... a dry run that raises on bad data without touching the ring
+        """
+        n = struct.unpack_from('<H', data, pos)[0]
+        pos += 2
+        for _ in range(n):
+            pos = self._unpack_entry(data, pos, apply)
+        return pos
+
+    def _unpack_entry(self, data, pos, apply):
+        ts = struct.unpack_from('<i', data, pos)[0]
+        value, pos = _unpack_value(data, pos + 4)
+        if apply:
+            self.add(value, ts)
+        return pos
 
     def get_formatted_entry(self, index, short_time=True):
         """Get a single entry formatted for display
@@ -68,33 +271,285 @@ class RingBuffer:
         
         return (timestamp, message)
 
+_TAG_INT   = 105            # ord('i')... tags go in as 'B': MicroPython's struct has no 'c'
+_TAG_FLOAT = 102            # ord('f')
+_TAG_STR   = 115            # ord('s')
+
+def _pack_value(out, v):
+    if isinstance(v, int):
+        out.extend(struct.pack('<Bi', _TAG_INT, v))
+    elif isinstance(v, float):
+        out.extend(struct.pack('<Bf', _TAG_FLOAT, v))
+    else:
+        b = str(v).encode()
+        out.extend(struct.pack('<BH', _TAG_STR, len(b)))
+        out.extend(b)
+
+def _unpack_value(data, pos):
+    """Returns (value, position after it)"""
+    tag = data[pos]
+    if tag == _TAG_INT:
+        return struct.unpack_from('<i', data, pos + 1)[0], pos + 5
+    if tag == _TAG_FLOAT:
+        return struct.unpack_from('<f', data, pos + 1)[0], pos + 5
+    if tag != _TAG_STR:
+        raise ValueError("bad value tag in packed ring")
+    n = struct.unpack_from('<H', data, pos + 1)[0]
+    pos += 3
+    if pos + n > len(data):
+        raise ValueError("packed ring truncated")
+    return str(bytes(data[pos:pos + n]), 'utf-8'), pos + n
+
+class RingWindow:
+    """
+    Cursor over a span of a ring's live storage... nothing is copied.
+    Element 0 is where iteration starts: step 1 walks oldest->newest, step -1 walks newest->oldest.
+    The span is fixed when the cursor is made, so use it straight away - don't keep it across adds.
+    """
+    def __init__(self, ring, start, count, step, modulus):
+        self.ring    = ring
+        self.start   = start
+        self.count   = count
+        self.step    = step
+        self.modulus = modulus
+
+    def __len__(self):
+        return self.count
+
+    def slot(self, k):
+        """Physical slot in the ring of element k"""
+        return (self.start + self.step * k) % self.modulus
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self.count
+        if k < 0 or k >= self.count:
+            raise IndexError("window index out of range")
+        return self.ring._entry(self.slot(k))
+
+    def time(self, k):
+        return self.ring._time_at(self.slot(k))
+
+    def value(self, k):
+        return self.ring._value_at(self.slot(k))
+
+    def __iter__(self):
+        for k in range(self.count):
+            yield self.ring._entry(self.slot(k))
+
+    def times(self):
+        for k in range(self.count):
+            yield self.ring._time_at(self.slot(k))
+
+    def values(self):
+        for k in range(self.count):
+            yield self.ring._value_at(self.slot(k))
+
 class DuplicateDetectingBuffer(RingBuffer):
-    def __init__(self, size, time_limit, time_formatter=None, short_time_formatter=None, value_formatter=None, logger=print):
+    """
+    Ring that folds a message repeated within time_limit secs of its last sighting into the existing entry.
+    The repeat count lives in its own column, so entries read back as (ts, message, count)
+    and a repeat is just a counter bump... no string building, no parsing it back out.
+
+    A small table of the last recent_keys distinct messages remembers where each one's entry lives,
+    so alternating alarms (A B A B...) fold too, instead of only back-to-back repeats.
+    Fixed size, dict lookup... O(1) per add.  The table's least recently seen message makes way for a new one.
+    """
+    def __init__(self, size, time_limit, time_formatter=None, short_time_formatter=None, value_formatter=None, logger=print, recent_keys=8):
         super().__init__(size, time_formatter, short_time_formatter, value_formatter, logger=logger)
         self.time_limit = time_limit
+        self.counts = array('i', [0 for _ in range(size)])      # parallel to buffer, by slot
+        self.writes = 0                                         # entries ever written... tells us if a remembered slot got overwritten
+        self._recent = {}                                       # message -> row in the table below
+        self._keys  = [None] * recent_keys
+        self._slot  = array('i', [0 for _ in range(recent_keys)])  # ring slot holding the message's entry
+        self._seq   = array('i', [0 for _ in range(recent_keys)])  # value of writes when that entry went in
+        self._seen  = array('i', [0 for _ in range(recent_keys)])  # last time the message turned up
         self.last_message = None
         self.last_message_time = 0
         self.repeat_count = 1
+
+    def _entry(self, slot):
+        ts, message = self.buffer[slot]
+        return (ts, message, self.counts[slot])
+
+    def _count_at(self, slot):
+        return self.counts[slot]
+
+    def _pack_entry(self, out, slot):
+        super()._pack_entry(out, slot)
+        out.extend(struct.pack('<i', self.counts[slot]))
+
+    def _unpack_entry(self, data, pos, apply):
+        """Restored entries go straight in... no folding, and the recent table starts empty"""
+        ts = struct.unpack_from('<i', data, pos)[0]
+        value, pos = _unpack_value(data, pos + 4)
+        count = struct.unpack_from('<i', data, pos)[0]
+        if apply:
+            RingBuffer.add(self, value, ts)
+            self.writes += 1
+            self.counts[self.index] = count
+        return pos + 4
+
+    def _free_row(self):
+        """Row for a new message: an unused one, else the least recently seen... O(recent_keys), only on a new entry"""
+        keys = self._keys
+        row = 0
+        for k in range(len(keys)):
+            if keys[k] is None:
+                return k
+            if self._seen[k] < self._seen[row]:
+                row = k
+        del self._recent[keys[row]]
+        keys[row] = None
+        return row
         
     def add(self, message, timestamp=None):
         """Add with duplicate detection"""
         ts = int(time.time()) if timestamp is None else timestamp
-        if not self.buffer:
-            super().add(message, ts)
-            self.last_message = message
-            self.last_message_time = ts
-            return
-            
-        if message == self.last_message:
-            if ts - self.last_message_time <= self.time_limit:
-                self.repeat_count += 1
-                # Update existing entry with repeat count
-                self.buffer[self.index] = (self.last_message_time, 
-                    f"{message} (repeated x{self.repeat_count})")
+        self.last_message = message
+        self.last_message_time = ts
+        row = self._recent.get(message)
+        if row is not None:
+            if ts - self._seen[row] <= self.time_limit and self.writes - self._seq[row] < self.size:
+                slot = self._slot[row]
+                self.counts[slot] += 1                          # in place... entry keeps its original timestamp
+                self._seen[row] = ts
+                self.repeat_count = self.counts[slot]
                 return
                 
-        # Different message or time expired - add new entry
+        # New message, time expired or its entry has been overwritten - add new entry
         self.repeat_count = 1
         super().add(message, ts)
-        self.last_message = message
-        self.last_message_time = ts
+        self.writes += 1
+        self.counts[self.index] = 1
+        if row is None:
+            row = self._free_row()
+            self._keys[row] = message
+            self._recent[message] = row
+        self._slot[row] = self.index
+        self._seq[row]  = self.writes
+        self._seen[row] = ts
+
+
+class _ColumnView:
+    """
+    Read-only stand-in for RingBuffer.buffer on a NumericRingBuffer.
+    Keeps the old buffer[index] -> (ts, value) and len(buffer) read pattern working for callers
+    (updateData, make_dr_lists, MenuNavigator...) without storing any tuples.
+    """
+    def __init__(self, ring):
+        self.ring = ring
+
+    def __len__(self):
+        return self.ring.count
+
+    def __getitem__(self, i):
+        count = self.ring.count
+        if i < 0:
+            i += count
+        if i < 0 or i >= count:
+            raise IndexError("ring index out of range")
+        return (self.ring.timestamps[i], self.ring.values[i])      # tuple only built on READ... not on add
+
+class NumericRingBuffer(RingBuffer):
+    """
+    Ring of integer samples, stored in two preallocated parallel arrays instead of a list of (ts, value) tuples.
+    add() writes straight into the arrays, so nothing is allocated per sample.
+
+    typecode is for the value column: 'H' suits kPa, use 'h' if values can go negative (eg depth).
+    Timestamps are 'i'... fine until 2038.
+    """
+    def __init__(self, size, time_formatter=None, short_time_formatter=None, value_formatter=None, logger=print, typecode='H', aggregate=False, resum_every=None):
+        super().__init__(size, time_formatter, short_time_formatter, value_formatter, logger=logger, aggregate=aggregate, resum_every=resum_every)
+        self.timestamps = array('i', [0 for _ in range(size)])
+        self.values     = array(typecode, [0 for _ in range(size)])
+        self.count      = 0
+        self.buffer     = _ColumnView(self)
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, slot):
+        return (self.timestamps[slot], self.values[slot])
+
+    def _time_at(self, slot):
+        return self.timestamps[slot]
+
+    def _value_at(self, slot):
+        return self.values[slot]
+
+    def add(self, value, timestamp=None):
+        """Add an integer sample - no allocation.  Floats must be converted by the caller"""
+        ts = int(time.time()) if timestamp is None else timestamp
+        self.index = (self.index + 1) % self.size
+        evicted = self.values[self.index] if self.count == self.size else None
+        self.timestamps[self.index] = ts
+        self.values[self.index] = value
+        if self.count < self.size:
+            self.count += 1
+        if self.aggregate:
+            self._fold(value, evicted)
+
+
+class SampleRing:
+    """
+    Fixed-rate samples with no timestamps, eg 1 Hz kPa... one array, 2 bytes a sample with 'H'.
+    Owns its write index: index is where the NEXT sample goes, at_offset(0) is the newest.
+    window/last give RingWindow cursors (values only), same as the timestamped rings.
+    """
+    def __init__(self, size, typecode='H'):
+        self.size     = size
+        self.typecode = typecode
+        self.samples  = array(typecode, [0 for _ in range(size)])
+        self.index   = 0
+        self.count   = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def at_offset(self, k):
+        """Sample k back from the newest... 0 is the newest"""
+        return self.samples[(self.index - 1 - k) % self.size]
+
+    def _entry(self, slot):
+        return self.samples[slot]
+
+    _value_at = _entry
+
+    def window(self, n=None):
+        """Cursor over the most recent n samples (all if None), oldest first"""
+        if n is None or n > self.count:
+            n = self.count
+        return RingWindow(self, self.index - n, n, 1, self.size)
+
+    def last(self, n=None):
+        """Cursor over the most recent n samples (all if None), newest first"""
+        if n is None or n > self.count:
+            n = self.count
+        return RingWindow(self, self.index - 1, n, -1, self.size)
+
+    def pack(self):
+        """size, count, write index then the raw array... restore with unpack()"""
+        return struct.pack('<HHH', self.size, self.count, self.index) + bytes(self.samples)    # array is native order... little-endian on rp2, as unpack expects
+
+    def unpack(self, data, pos=0, apply=True):
+        """Restore from pack() output at data[pos:], if the size still matches.  Returns the position after it"""
+        size, count, index = struct.unpack_from('<HHH', data, pos)
+        pos += 6
+        end = pos + size * struct.calcsize(self.typecode)
+        if end > len(data):
+            raise ValueError("packed ring truncated")
+        if apply and size == self.size:
+            saved = struct.unpack_from(f'<{size}{self.typecode}', data, pos)     # once, at boot... the tuple is fine
+            for k in range(size):
+                self.samples[k] = saved[k]
+            self.count = count
+            self.index = index
+        return end
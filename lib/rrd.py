@@ -0,0 +1,110 @@
+# Round-robin archive... fixed size multi-resolution history, all in RAM
+
+import time
+import struct
+from array import array
+from ringbuffer import NumericRingBuffer
+
+class ArchiveTier(NumericRingBuffer):
+    """
+    One resolution level of a RoundRobinArchive: a NumericRingBuffer whose values column holds the period MEAN,
+    with extra low/high columns alongside.  Entries read back as (period start ts, low, mean, high).
+    Being a ring, window/last/since/between all work on it as-is.
+    """
+    def __init__(self, size, period, typecode='H', time_formatter=None, short_time_formatter=None):
+        super().__init__(size, time_formatter, short_time_formatter, typecode=typecode)
+        self.period = period                    # seconds per entry
+        self.lows   = array(typecode, [0 for _ in range(size)])
+        self.highs  = array(typecode, [0 for _ in range(size)])
+
+    def _entry(self, slot):
+        return (self.timestamps[slot], self.lows[slot], self.values[slot], self.highs[slot])
+
+    def add_summary(self, ts, low, mean, high):
+        self.add(mean, ts)
+        self.lows[self.index]  = low
+        self.highs[self.index] = high
+
+class _Consolidator:
+    """Rolls samples (or finer summaries) up into one tier entry per period, then passes the summary on up"""
+    def __init__(self, tier, upstream=None):
+        self.tier     = tier
+        self.period   = tier.period
+        self.upstream = upstream
+        self.start = 0
+        self.low   = 0
+        self.high  = 0
+        self.total = 0
+        self.n     = 0
+
+    def feed(self, ts, low, total, high, n):
+        start = ts - ts % self.period
+        if self.n > 0 and start != self.start:
+            self.flush()
+        if self.n == 0:
+            self.start = start
+            self.low   = low
+            self.high  = high
+            self.total = total
+            self.n     = n
+            return
+        if low < self.low:   self.low = low
+        if high > self.high: self.high = high
+        self.total += total
+        self.n     += n
+
+    def flush(self):
+        """Close off the current period.  Mean rounded to the nearest int... the tier columns are integer"""
+        if self.n == 0:
+            return
+        mean = (2 * self.total + self.n) // (2 * self.n)
+        self.tier.add_summary(self.start, self.low, mean, self.high)
+        if self.upstream is not None:
+            self.upstream.feed(self.start, self.low, self.total, self.high, self.n)     # exact... upstream mean weighted by sample count
+        self.n = 0
+
+class RoundRobinArchive:
+    """
+    1-minute low/mean/high for a few hours, hourly for a week... optionally raw samples too, but the live rings
+    usually hold those already.
+    Every column is allocated up front, so footprint() is known at init and never grows.
+    Query any tier directly (raw, minutes, hours) or let select() pick the finest one that spans the period wanted.
+    Periods still being accumulated are not visible until they close.
+    """
+    def __init__(self, raw_size=0, minute_size=240, hour_size=168, typecode='H', raw_period=1, time_formatter=None, short_time_formatter=None):
+        self.raw        = NumericRingBuffer(raw_size, time_formatter, short_time_formatter, typecode=typecode) if raw_size > 0 else None
+        self.raw_period = raw_period            # nominal seconds between samples... only used by select()
+        self.minutes    = ArchiveTier(minute_size, 60, typecode, time_formatter, short_time_formatter)
+        self.hours      = ArchiveTier(hour_size, 3600, typecode, time_formatter, short_time_formatter)
+        self.typecode   = typecode
+        self._hour_acc   = _Consolidator(self.hours)
+        self._minute_acc = _Consolidator(self.minutes, self._hour_acc)
+
+    def add(self, value, timestamp=None):
+        """Add an integer sample to the raw tier, and roll it into the minute (and so hourly) summaries"""
+        ts = int(time.time()) if timestamp is None else timestamp
+        if self.raw is not None:
+            self.raw.add(value, ts)
+        self._minute_acc.feed(ts, value, value, value, 1)
+
+    def tiers(self):
+        if self.raw is None:
+            return (self.minutes, self.hours)
+        return (self.raw, self.minutes, self.hours)
+
+    def select(self, span_secs):
+        """Finest tier whose capacity covers the last span_secs... hours if nothing does"""
+        if self.raw is not None and span_secs <= self.raw.size * self.raw_period:
+            return self.raw
+        if span_secs <= self.minutes.size * self.minutes.period:
+            return self.minutes
+        return self.hours
+
+    def footprint(self):
+        """Bytes held in the data columns... fixed from __init__ on"""
+        ts_bytes  = struct.calcsize('i')
+        val_bytes = struct.calcsize(self.typecode)
+        total = self.raw.size * (ts_bytes + val_bytes) if self.raw is not None else 0     # ts, value
+        for tier in (self.minutes, self.hours):
+            total += tier.size * (ts_bytes + 3 * val_bytes)             # ts, low, mean, high
+        return total
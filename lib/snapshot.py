@@ -0,0 +1,98 @@
+# Binary snapshot of the ring buffers... so a soft_reset, crash or power cycle doesn't start us from scratch
+
+import os
+import time
+import struct
+from array import array
+
+MAGIC   = b'TMRS'
+VERSION = 2
+_HEADER = '<4sBi'           # magic, version, time saved
+
+try:
+    _STRUCT_ERROR = struct.error
+except AttributeError:      # MicroPython's struct raises ValueError
+    _STRUCT_ERROR = ValueError
+_BAD_FILE = (OSError, ValueError, IndexError, _STRUCT_ERROR)    # what a truncated or corrupt file can raise... anything else is a bug
+
+def save(filename:str, rings:list, samples:list)->int:
+    """
+    Write one snapshot file.  Returns bytes written.
+
+    Args:
+        rings:   anything with pack()/unpack()... RingBuffers, SampleRings.  Fixed order: load() must be given the same
+        samples: (list, next write index) for each plain list ring, eg depth_ROC_ring
+    Goes to a temp file first then renamed over the old one, so a crash mid-write can't leave half a snapshot.
+    """
+    tmp = filename + '.tmp'
+    written = 0
+    with open(tmp, 'wb') as f:
+        written += f.write(struct.pack(_HEADER, MAGIC, VERSION, int(time.time())))
+        written += f.write(struct.pack('<B', len(rings)))
+        for ring in rings:
+            written += f.write(ring.pack())
+        written += f.write(struct.pack('<B', len(samples)))
+        for values, index in samples:
+            written += f.write(struct.pack('<HH', len(values), index))
+            written += f.write(bytes(array('i', values)))
+    os.rename(tmp, filename)
+    return written
+
+def load(filename:str, rings:list, samples:list, max_age:int):
+    """
+    Restore a snapshot written by save(), in one read.  Rings should be freshly made (empty);
+    sample lists are overwritten in place.  Nothing is touched unless the whole file parses.
+
+    Returns:
+        list of next write indexes, one per sample list... or None if there's no usable snapshot:
+        missing, wrong version or shape, truncated or corrupt, or saved more than max_age secs ago
+        (or in the future... clock not set).  Any other exception is a bug, and is left for the caller to log
+    """
+    try:
+        with open(filename, 'rb') as f:
+            data = memoryview(f.read())
+    except OSError:
+        return None
+
+    try:
+        magic, version, saved_at = struct.unpack_from(_HEADER, data, 0)
+        age = time.time() - saved_at
+        if bytes(magic) != MAGIC or version != VERSION or age < 0 or age > max_age:
+            return None
+        # parse everything once without touching the rings... a truncated or corrupt file must leave them all empty,
+        # not half restored.  Only then restore for real
+        for apply in (False, True):
+            indexes = _restore(data, rings, samples, apply)
+            if indexes is None:
+                return None
+        return indexes
+    except _BAD_FILE:                       # truncated or corrupt file... start afresh
+        return None
+
+def _restore(data, rings, samples, apply):
+    """
+    One pass over the snapshot body.  apply=False is a dry run: raises on bad data, changes nothing.
+    None if the file holds a different number of rings or sample lists than we were given
+    """
+    pos = struct.calcsize(_HEADER)
+    if data[pos] != len(rings):
+        return None
+    pos += 1
+    for ring in rings:
+        pos = ring.unpack(data, pos, apply)
+
+    if data[pos] != len(samples):
+        return None
+    pos += 1
+    indexes = [0] * len(samples)
+    for i in range(len(samples)):
+        n, index = struct.unpack_from('<HH', data, pos)
+        pos += 4
+        saved = struct.unpack_from(f'<{n}i', data, pos)
+        values = samples[i][0]
+        if apply and n == len(values):      # if the ring size changed since the save, leave this one empty
+            for k in range(n):
+                values[k] = saved[k]
+            indexes[i] = index
+        pos += 4 * n
+    return indexes
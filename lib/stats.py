@@ -1,53 +1,140 @@
 import math     # type: ignore
+from monoqueue import MonotonicDeque      # SlidingMinMax builds on it
 
-def mean_stddev(buff:list, count:int, startidx:int, ringlen:int)->tuple[float, float]:
+try:
+    from ulab import numpy as np        # type: ignore  # on the Pico... only if the firmware was built with ulab
+    _FLOAT = np.float
+except ImportError:
+    try:
+        import numpy as np              # type: ignore  # on the host
+        _FLOAT = np.float64
+    except ImportError:
+        np = None
+
+# Crossovers, per kernel: shorter windows are quicker as plain loops.  Host numpy figures, NOT yet measured
+# on the Pico under ulab... rerun bench/bench_vector.py there to tune.  No MainTX window is this long today:
+# calc_average_HFpressure averages 3-30 samples (and is fixed_point anyway), so the vector paths are for longer windows
+VECTOR_MIN_MEAN   = 256     # ring_mean
+VECTOR_MIN_STDDEV = 128     # mean_stddev
+VECTOR_MIN_LINREG = 256     # linear_regression
+
+def tuple_value(entry):
+    """Accessor for (timestamp, value) tuple rings"""
+    return entry[1]
+
+def mean_stddev(buff:list, count:int, startidx:int, ringlen:int, fixed_point:bool=False, key=None)->tuple[float, float]:
     """
         Args:
-            buff:   list of values, stored in a ring buffer.  Either scalar or tuple...
+            buff:   values stored in a ring buffer... a list, or a column of an array-backed ring (ring.values, ring.samples)
             count:  number of values to use
             startidx: position in ring to begin at... and then...
             look BACKWARDS from ABSOLUTE index startidx... NOT relative to hf_index
+            fixed_point: values are ints (kPa, mm)... accumulate in ints, floats only at the end
+            key:    accessor applied to each element, eg tuple_value.  Defaults to tuple_value if buff holds tuples
 
         Returns:
             tuple containg mean and sample std deviation
+
+        One pass (Welford), so each element is read once... and no big sum to lose precision against.
     """
     if count > ringlen:     # ooh - that's bad...
         print(f"mean_stddev: Count {count} reduced to {ringlen}")
         count = ringlen     # should probably raise an exception...
     if count < 2:
         return 0, 0
+    if key is None and isinstance(buff[0], tuple):      # let's see what we have here...
+        key = tuple_value
+    if fixed_point:
+        return _mean_stddev_fixed(buff, count, startidx, ringlen, key)
+    if np is not None and count >= VECTOR_MIN_STDDEV and key is None:
+        v = _ring_vector(buff, count, startidx, ringlen)
+        return float(np.mean(v)), float(np.std(v, ddof=1))
     
-    s = 0.0
-    ss_diffs = 0.0
-
-    tuplebuf:bool = isinstance(buff[0], tuple)      # let's see what we have here...
-    if not tuplebuf:
-        for i in range(count):
-            mod_index = (startidx - 1 - i) % ringlen
-            s += buff[mod_index]    
-        mean: float = s / count
-
-        for i in range(count):
-            mod_index = (startidx - 1 - i) % ringlen
-            x = buff[mod_index]
-            diff = (x - mean)
-            ss_diffs += diff * diff
-    else:       # tuples, (timestamp, value)
-        for i in range(count):
-            mod_index = (startidx - 1 - i) % ringlen
-            s += buff[mod_index][1]    
-        mean: float = s / count
-
-        for i in range(count):
-            mod_index = (startidx - 1 - i) % ringlen
-            x = buff[mod_index][1]
-            diff = (x - mean)
-            ss_diffs += diff * diff
-
-    v = ss_diffs / (count - 1)
-    sd = math.sqrt(v)
+    mean = 0.0
+    m2 = 0.0                                # running Σ(x - mean)²
+    for i in range(count):
+        x = buff[(startidx - 1 - i) % ringlen]
+        if key is not None:
+            x = key(x)
+        diff = x - mean
+        mean += diff / (i + 1)
+        m2 += diff * (x - mean)
+
+    sd = math.sqrt(m2 / (count - 1))
     return mean, sd
 
+def ring_mean(buff, count:int, startidx:int, ringlen:int, fixed_point:bool=False)->float:
+    """
+    Mean of the count values ending just before ABSOLUTE index startidx... same addressing as mean_stddev
+    fixed_point: values are ints... sum stays an int, never the float vector path, one division at the end
+    """
+    if np is not None and count >= VECTOR_MIN_MEAN and not fixed_point:
+        return float(np.mean(_ring_vector(buff, count, startidx, ringlen)))
+    s = 0
+    for i in range(count):
+        s += buff[(startidx - 1 - i) % ringlen]
+    return s / count
+
+def _ring_vector(buff, count, startidx, ringlen):
+    """
+    The count values ending just before startidx, oldest first, as one float vector.
+    A ring window is at most two contiguous slices, so no per-element modulo.
+    """
+    first = (startidx - count) % ringlen
+    if first + count <= ringlen:
+        return np.array(buff[first:first + count], dtype=_FLOAT)
+    return np.concatenate((np.array(buff[first:ringlen], dtype=_FLOAT),
+                           np.array(buff[0:first + count - ringlen], dtype=_FLOAT)))
+
+def _linreg_vector(x, y, count, startidx, ringlen, dummy_x):
+    """linear_regression on ulab/numpy vectors... two-pass (centred) sums, but each pass is one call"""
+    yv = _ring_vector(y, count, startidx, ringlen)
+    y_mean = float(np.mean(yv))
+    dy = yv - y_mean
+    if dummy_x:
+        x_mean, sum_xx = _dummy_x(count)
+        dx = np.arange(1, count + 1, dtype=_FLOAT) - x_mean     # oldest x = 1... as the loop version
+    else:
+        xv = _ring_vector(x, count, startidx, ringlen)
+        x_mean = float(np.mean(xv))
+        dx = xv - x_mean
+        sum_xx = float(np.sum(dx * dx))
+    sum_xy = float(np.sum(dx * dy))
+    sum_yy = float(np.sum(dy * dy))
+    if sum_xx <= 0:
+        raise ValueError("x values must not all be equal")
+
+    slope = sum_xy / sum_xx
+    intercept = y_mean - slope * x_mean
+    ss_reg = slope * sum_xy
+    ss_dev = sum_yy - ss_reg
+    if ss_dev < 0: ss_dev = 0
+    r_squared   = (ss_reg / sum_yy) if sum_yy != 0 else 0
+    std_dev     = math.sqrt(sum_yy / (count-1))
+    sd_resids   = math.sqrt(ss_dev / (count-1))
+    return slope, intercept, std_dev, sd_resids, r_squared
+
+def _mean_stddev_fixed(buff, count, startidx, ringlen, key):
+    """One pass, integer sums relative to the first value... n² var = nΣd² - (Σd)², exact"""
+    v0 = buff[(startidx - 1) % ringlen]
+    if key is not None: v0 = key(v0)
+    sd = sdd = 0
+    for i in range(1, count):
+        v = buff[(startidx - 1 - i) % ringlen]
+        d = (key(v) if key is not None else v) - v0
+        sd  += d
+        sdd += d * d
+    return v0 + sd / count, math.sqrt((count * sdd - sd * sd) / (count * (count - 1)))
+
+_dummy_x_stats = {}      # count -> (x mean, Σ(x - x̄)²) for x = 1..count... closed form, so only ever worked out once
+
+def _dummy_x(count:int)->tuple[float, float]:
+    st = _dummy_x_stats.get(count)
+    if st is None:
+        st = ((count + 1) / 2, count * (count * count - 1) / 12)
+        _dummy_x_stats[count] = st
+    return st
+
 def linear_regression(x: list, y: list, count:int, startidx:int, ringlen:int, dummy_x:bool) -> tuple[float, float, float, float, float]:
     """
     Calculate linear regression coefficients (slope, intercept) and other stats (std dev and r-squared).
@@ -61,7 +148,11 @@ def linear_regression(x: list, y: list, count:int, startidx:int, ringlen:int, du
         dummy_x: if True, ignore x buffer, fake x (assumes regular spaced samples)
         
     Returns:
-        Tuple of (slope, intercept, std deviation, r-squared)
+        Tuple of (slope, intercept, std deviation, SD of residuals, r-squared)
+
+    One pass over the ring.  Values are taken relative to the first sample read, so the sums stay small
+    (single precision floats on the Pico...).  With dummy_x the x stats are closed form, and ss_reg = slope² * sum_xx
+    saves the old third pass working out predicted y values.
     """
     if count < 2:
         raise ValueError("linreg count param must be >= 2")
@@ -69,82 +160,565 @@ def linear_regression(x: list, y: list, count:int, startidx:int, ringlen:int, du
     xcount = len(x)
     if xcount != len(y) or xcount < 2:
         raise ValueError("x and y must have same length and length >= 2")
+    if np is not None and count >= VECTOR_MIN_LINREG:
+        return _linreg_vector(x, y, count, startidx, ringlen, dummy_x)
         
  # Now... make it work round a ring buffer, not a straight list
- # Also... look backwards, simulating previous n readings
-    ring_xbar = ring_ybar = 0.0
-    # my_x = count
-    for i in range(count):
-        # my_x -= 1
-        mod_idx = (startidx - 1 - i) % ringlen
-        if dummy_x:
-            xi = count - i
-        else:
-            xi = x[mod_idx]
-        yi = y[mod_idx]
-        # ring_xbar += my_x
-        ring_xbar += xi
-        ring_ybar += yi
-
-    x_mean = ring_xbar / count
-    y_mean = ring_ybar / count
-
-    sum_xy = sum_xx = sum_yy = 0.0
-    ss_reg = ss_tot = 0.0  # For R-squared calculation
+ # Also... look backwards, simulating previous n readings.  x runs from count (newest) down to 1
+    y0 = y[(startidx - 1) % ringlen]
+    sum_dy = sum_dyy = 0
+    if dummy_x:
+        sum_idy = 0                             # Σ i*dy... x = count - i, so Σ x*dy = count*Σdy - Σ i*dy
+        for i in range(1, count):
+            dy = y[(startidx - 1 - i) % ringlen] - y0
+            sum_dy  += dy
+            sum_dyy += dy * dy
+            sum_idy += i * dy
+        x_mean, sum_xx = _dummy_x(count)
+        sum_xy = count * sum_dy - sum_idy - x_mean * sum_dy
+    else:
+        x0 = x[(startidx - 1) % ringlen]
+        sum_dx = sum_dxx = sum_dxy = 0
+        for i in range(1, count):
+            mod_idx = (startidx - 1 - i) % ringlen
+            dx = x[mod_idx] - x0
+            dy = y[mod_idx] - y0
+            sum_dx  += dx
+            sum_dxx += dx * dx
+            sum_dy  += dy
+            sum_dyy += dy * dy
+            sum_dxy += dx * dy
+        x_mean = x0 + sum_dx / count
+        sum_xx = sum_dxx - sum_dx * sum_dx / count
+        sum_xy = sum_dxy - sum_dx * sum_dy / count
 
-    # my_x = count
-    for i in range(count):
-        # my_x -= 1
-        mod_idx = (startidx - 1 - i) % ringlen
-        if dummy_x:
-            xi = count - i
-        else:
-            xi = x[mod_idx]
-        yi = y[mod_idx]
+    y_mean = y0 + sum_dy / count
+    sum_yy = sum_dyy - sum_dy * sum_dy / count
 
-        # Differences from means
-        dx = xi - x_mean
-        dy = yi - y_mean
-        
-        # Sums for regression
-        sum_xy += dx * dy
-        sum_xx += dx * dx
-        sum_yy += dy * dy
-
-    if sum_xx == 0:
+    if sum_xx <= 0:
         raise ValueError("x values must not all be equal")
     
     # Calculate regression coefficients
     slope = sum_xy / sum_xx
     intercept = y_mean - slope * x_mean
 
-    # print(f'{mod_idx=:2}  {xi=}, {yi=:.1f}')
-    # num = sum((xi - x_mean) * (yi - y_mean) for i in range(n))
-    # den = sum((xi - x_mean) ** 2 for i in range(n))
-    # std_dev = math.sqrt(sum((yi - y_mean) * (yi - y_mean) for i in range(n))) / (n-1)
-    
+    ss_reg = slope * sum_xy                     # SS due to regression... == slope² * sum_xx
+    ss_tot = sum_yy if sum_yy > 0 else 0        # Total sum of squares.  Clamp... cancellation can leave a tiny negative
+    ss_dev = ss_tot - ss_reg                    # SS due to deviations ref... page 7-3 of my DAES lecture notes !!
+    if ss_dev < 0: ss_dev = 0
+    r_squared   = (ss_reg / ss_tot) if ss_tot != 0 else 0
+    std_dev     = math.sqrt(ss_tot / (count-1))
+    sd_resids   = math.sqrt(ss_dev / (count-1))
+    return slope, intercept, std_dev, sd_resids, r_squared
+
+
+def _median_sorted(a:list):
+    """Median of a list, sorting it in place"""
+    a.sort()
+    n = len(a)
+    h = n >> 1
+    return a[h] if n & 1 else (a[h - 1] + a[h]) / 2
+
+def theil_sen(x: list, y: list, count:int, startidx:int, ringlen:int, dummy_x:bool) -> tuple[float, float, float]:
+    """
+    Robust line fit: slope is the median of the slopes between every pair of points, intercept the median of
+    what's left.  One wild point moves it hardly at all, where it can swing least squares a long way.
+    Ring arguments as for linear_regression.
+
+    Returns:
+        Tuple of (slope, intercept, robust SD of residuals)... 1.4826 * MAD, which equals the SD for normal noise
+
+    n(n-1)/2 pair slopes are sorted, so it's O(n² log n)... 66 slopes for the 12 entry depth ring, fine once a loop,
+    but not for the kPa windows.  Pairs sharing an x are skipped.
+    """
+    if count < 2:
+        raise ValueError("theil_sen count param must be >= 2")
+
+    y0 = y[(startidx - 1) % ringlen]
+    x0 = count if dummy_x else x[(startidx - 1) % ringlen]
+    dxs = [0] * count
+    dys = [0] * count
     for i in range(count):
-        # my_x -= 1
         mod_idx = (startidx - 1 - i) % ringlen
-        if dummy_x:
-            xi = count - i
+        dxs[i] = (count - i if dummy_x else x[mod_idx]) - x0        # relative to the first sample, as linear_regression
+        dys[i] = y[mod_idx] - y0
+
+    slopes = []
+    for i in range(count - 1):
+        xi = dxs[i]
+        yi = dys[i]
+        for j in range(i + 1, count):
+            dx = dxs[j] - xi
+            if dx != 0:
+                slopes.append((dys[j] - yi) / dx)
+    if not slopes:
+        raise ValueError("x values must not all be equal")
+    slope = _median_sorted(slopes)
+
+    resids = [dys[i] - slope * dxs[i] for i in range(count)]
+    offset = _median_sorted(resids)
+    for i in range(count):
+        resids[i] = abs(resids[i] - offset)
+    sd_resids = 1.4826 * _median_sorted(resids)
+    intercept = y0 + offset - slope * x0
+    return slope, intercept, sd_resids
+
+
+def _bisect_left(a, x)->int:
+    """First position in sorted list a where x could go... MicroPython has no bisect module"""
+    lo, hi = 0, len(a)
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if a[mid] < x:
+            lo = mid + 1
         else:
-            xi = x[mod_idx]        
-        yi = y[mod_idx]
-        
-        # Predicted y value
-        # y_pred = slope * x[mod_idx] + intercept
-        y_pred = slope * xi + intercept
-        # 
-        # print(f'{xi} {y_pred} {yi}')
-        # Sum of squares of due to regression
-        ss_reg += (y_pred - y_mean) ** 2
-        # Total sum of squares
-        ss_tot += (yi - y_mean) ** 2
-    
-    ss_dev      = ss_tot - ss_reg        # SS due to deviations ref... page 7-3 of my DAES lecture notes !!
-    r_squared   = (ss_reg / ss_tot) if ss_tot != 0 else 0
-    std_dev     = math.sqrt(sum_yy / (count-1))  # Using sum_yy we calculated earlier
-    sd_resids   = math.sqrt(ss_dev / (count-1))
-    # print(f'{x_mean=} {y_mean=} {sum_xy=} {sum_xx=}')
-    return slope, intercept, std_dev, sd_resids, r_squared
\ No newline at end of file
+            hi = mid
+    return lo
+
+def _bisect_right(a, x)->int:
+    """Position after any entries equal to x"""
+    lo, hi = 0, len(a)
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if x < a[mid]:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+class MedianFilter:
+    """
+    Sliding median / MAD spike filter (Hampel).  Each sample is checked against the last n before it:
+    a spike if it's further from their median than threshold robust SDs (1.4826 * MAD), and never if within min_dev.
+    Spikes are replaced by the median; everything still goes into the window, so a genuine step is
+    accepted once it makes up half the window.
+
+    The window is kept sorted... bisect to find where a sample goes in or comes out, O(log n) compares.
+    Median is the upper one for an even count, so int samples stay ints.
+    """
+    def __init__(self, n:int, threshold:float=3.0, min_dev=0):
+        self.n = n
+        self.threshold = threshold * 1.4826
+        self.min_dev = min_dev
+        self.sorted = []            # the window, in order
+        self.arrivals = [0] * n     # the window, oldest first... so we know which value leaves
+        self.head = 0
+        self.outliers = 0           # spikes caught so far
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def median(self):
+        s = self.sorted
+        return s[len(s) >> 1] if s else None
+
+    def mad(self):
+        """
+        Median absolute deviation from the median.  Distances below and above the median are each already sorted,
+        so walk outwards from the middle, merging, until the middle distance... O(n/2), no sorting
+        """
+        s = self.sorted
+        m = len(s)
+        if m == 0:
+            return 0
+        h = m >> 1
+        med = s[h]
+        d = 0
+        i = h - 1
+        j = h + 1
+        for _ in range(h):                  # s[h] itself is distance 0... then h more
+            if i >= 0 and (j >= m or med - s[i] <= s[j] - med):
+                d = med - s[i]
+                i -= 1
+            else:
+                d = s[j] - med
+                j += 1
+        return d
+
+    def add(self, x)->None:
+        s = self.sorted
+        if len(s) == self.n:                # full... drop the oldest
+            old = self.arrivals[self.head]
+            del s[_bisect_left(s, old)]
+        s.insert(_bisect_right(s, x), x)
+        self.arrivals[self.head] = x
+        self.head = (self.head + 1) % self.n
+
+    def filter(self, x)->tuple:
+        """Check x against the window, then add it.  Returns (x, False)... or (median, True) if x is a spike"""
+        med = None
+        if len(self.sorted) >= 3:
+            med = self.median()
+            limit = self.threshold * self.mad()
+            if limit < self.min_dev:
+                limit = self.min_dev
+            if abs(x - med) <= limit:
+                med = None
+        self.add(x)
+        if med is None:
+            return x, False
+        self.outliers += 1
+        return med, True
+
+
+class SlidingMinMax:
+    """
+    Max and min over several trailing windows of one sample stream at once... eg last 12 and last 60 kPa samples.
+    One MonotonicDeque pair per window, so add() is O(1) amortised per window and max()/min() are O(1).
+
+    Args:
+        windows: window lengths, in samples
+    """
+    def __init__(self, windows):
+        self.windows = tuple(windows)
+        self._maxq = {w: MonotonicDeque(w, True) for w in self.windows}
+        self._minq = {w: MonotonicDeque(w, False) for w in self.windows}
+        self.seq = 0                        # samples added so far
+
+    def clear(self)->None:
+        for w in self.windows:
+            self._maxq[w].clear()
+            self._minq[w].clear()
+        self.seq = 0
+
+    def add(self, value)->None:
+        seq = self.seq
+        for w in self.windows:
+            first = seq - w + 1
+            q = self._maxq[w]
+            q.expire(first)
+            q.push(seq, value)
+            q = self._minq[w]
+            q.expire(first)
+            q.push(seq, value)
+        self.seq = seq + 1
+
+    def max(self, window:int):
+        """Largest of the last window samples (fewer if not that many yet)... None if empty"""
+        return self._maxq[window].peek()
+
+    def min(self, window:int):
+        return self._minq[window].peek()
+
+    def spread(self, window:int):
+        """max - min over the window... 0 if empty"""
+        q = self._maxq[window]
+        return q.peek() - self._minq[window].peek() if q.length > 0 else 0
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile (P² algorithm, Jain & Chlamtac): five markers, O(1) memory and time per sample,
+    no samples kept.  Markers sit at the min, p/2, p, (1+p)/2 and max, and are nudged along a parabola as data arrives.
+
+    Args:
+        p: quantile wanted, 0 < p < 1... eg 0.5 for the median
+    """
+    def __init__(self, p:float):
+        self.p = p
+        self.heights = [0.0] * 5
+        self.positions = [0, 1, 2, 3, 4]            # 0-based ranks of the markers
+        self.increments = (0, p / 2, p, (1 + p) / 2, 1)
+        self.count = 0
+
+    def add(self, x)->None:
+        q = self.heights
+        c = self.count
+        if c < 5:                                   # first five just fill the markers
+            q[c] = x
+            self.count = c + 1
+            if c == 4:
+                q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        c += 1
+        self.count = c
+
+        # desired positions worked out from the count, rather than accumulated... no float drift over a long run
+        for i in range(1, 4):
+            d = (c - 1) * self.increments[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * ((n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                                                       + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:    # parabola overshot... linear instead
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def value(self):
+        """Current estimate... exact while there are five samples or fewer, None if none"""
+        c = self.count
+        if c == 0:
+            return None
+        if c >= 5:
+            return self.heights[2]
+        s = sorted(self.heights[:c])
+        return s[int(self.p * (c - 1) + 0.5)]
+
+
+class Cusum:
+    """
+    Two-sided CUSUM (Page) step detector, O(1) per sample.  Sums how far samples sit beyond reference ± k SDs,
+    and signals when either sum passes h SDs.
+
+    The reference mean is learned from the first `learn` samples after each restart()... eg each pump run, since the
+    level moves with tank head.  The SD is pooled over every learning window so far, so it settles on the noise
+    of whatever this detector watches (one per zone, say) and isn't thrown by one quiet run.
+    Nothing is signalled while learning.
+
+    With track > 0 the reference then follows the samples, y += track * (x - y), with each pull clipped to k SDs...
+    so a slow drift is followed (a ramp lags by about 1.5 * slope/track) but a step moves it only k * SD * track per sample.
+
+    Args:
+        k:      allowance, in SDs... shifts smaller than about 2k are ignored
+        h:      decision threshold, in SDs
+        learn:  samples to learn the reference mean from
+        min_sd: floor on the SD... integer samples can look noiseless
+        track:  reference tracking rate per sample, 0 to hold it where learning left it
+    """
+    def __init__(self, k:float=0.5, h:float=5.0, learn:int=60, min_sd:float=1.0, track:float=0.0):
+        self.k = k
+        self.h = h
+        self.learn = learn
+        self.min_sd = min_sd
+        self.track = track
+        self.mean = 0.0
+        self.sd = min_sd
+        self.hi = 0.0               # evidence of a rise, in SDs
+        self.lo = 0.0               # and of a drop
+        self.shift = 0.0            # size of the last signalled shift, in sample units... signed
+        self._pool_ss = 0.0         # within-window sum of squares, all learning windows so far
+        self._pool_df = 0
+        self.restart()
+
+    def restart(self)->None:
+        self.hi = 0.0
+        self.lo = 0.0
+        self._hi_n = 0              # samples since each sum was last zero... for the shift estimate
+        self._lo_n = 0
+        self._n = 0
+        self._mean = 0.0
+        self._ss = 0.0
+
+    def learning(self)->bool:
+        return self._n < self.learn
+
+    def add(self, x)->int:
+        """
+        Returns 1 on a rise, -1 on a drop, else 0.  Sums restart after a signal, so a lasting shift signals once per h.
+        On a signal, self.shift estimates the new level less the reference: k SDs plus the sum's mean excess per sample...
+        low if the sum had already started on noise before the step
+        """
+        n = self._n
+        if n < self.learn:                  # Welford, for the reference
+            n += 1
+            d = x - self._mean
+            self._mean += d / n
+            self._ss += d * (x - self._mean)
+            self._n = n
+            if n == self.learn:
+                self.mean = self._mean
+                self._pool_ss += self._ss
+                self._pool_df += n - 1
+                if self._pool_df > 0:
+                    sd = math.sqrt(self._pool_ss / self._pool_df)
+                    self.sd = sd if sd > self.min_sd else self.min_sd
+            return 0
+
+        z = (x - self.mean) / self.sd
+        hi = self.hi + z - self.k
+        lo = self.lo - z - self.k
+        if hi > 0:
+            self.hi = hi
+            self._hi_n += 1
+        else:
+            self.hi = 0.0
+            self._hi_n = 0
+        if lo > 0:
+            self.lo = lo
+            self._lo_n += 1
+        else:
+            self.lo = 0.0
+            self._lo_n = 0
+        if lo > self.h:
+            self.shift = -(self.k + lo / self._lo_n) * self.sd
+            self._clear()
+            return -1
+        if hi > self.h:
+            self.shift = (self.k + hi / self._hi_n) * self.sd
+            self._clear()
+            return 1
+        if self.track:                      # follow, but each sample's pull is clipped to the allowance... a step can't drag it far
+            z = z if -self.k < z < self.k else (self.k if z > 0 else -self.k)
+            self.mean += self.track * z * self.sd
+        return 0
+
+    def _clear(self)->None:
+        self.hi = self.lo = 0.0
+        self._hi_n = self._lo_n = 0
+
+
+class GoertzelBank:
+    """
+    Sliding DFT (sliding Goertzel) at a few bins over the last n samples: per bin, O(1) work per sample.
+        X_k <- (X_k + x_new - x_leaving) * e^(j2πk/n)
+    Bins are whole cycles per window, so a steady level (bin 0) cancels out once the window is full...
+    the caller hands over the sample leaving the window, so the samples themselves live in the caller's ring.
+    No damping, so floats are exact up to rounding; reset() when the signal restarts, eg each pump run.
+
+    With diff_clip > 0 the bank is fed first differences, x[i] - x[i-1], clipped to ±diff_clip.  A level or a ramp
+    then cancels, and a step is one clipped impulse rather than an edge that leaks into every bin for a whole window.
+    Amplitudes are scaled back to sample units (a sine's difference is 2sin(πk/n) times smaller).
+
+    Args:
+        n:    window, samples
+        bins: DFT bin numbers... bin k is a period of n/k samples
+        diff_clip: 0 to take samples, else take differences and clip them to this
+    """
+    def __init__(self, n:int, bins, diff_clip=0):
+        self.n = n
+        self.bins = tuple(bins)
+        self.diff_clip = diff_clip
+        self.cos = [math.cos(2 * math.pi * k / n) for k in self.bins]
+        self.sin = [math.sin(2 * math.pi * k / n) for k in self.bins]
+        self.gain = [2 / n / (2 * math.sin(math.pi * k / n)) if diff_clip else 2 / n for k in self.bins]
+        self.re = [0.0] * len(self.bins)
+        self.im = [0.0] * len(self.bins)
+        self.count = 0
+
+    def reset(self)->None:
+        for i in range(len(self.bins)):
+            self.re[i] = 0.0
+            self.im[i] = 0.0
+        self.count = 0
+
+    def add(self, x, leaving)->None:
+        """
+        x is the new sample, leaving the one n samples before it... ignored until the window has filled.
+        With diff_clip, both are differences: newest less the one before, and the same n samples back
+        """
+        clip = self.diff_clip
+        if clip:
+            x = clip if x > clip else (-clip if x < -clip else x)
+            leaving = clip if leaving > clip else (-clip if leaving < -clip else leaving)
+        if self.count < self.n:
+            self.count += 1
+            d = x
+        else:
+            d = x - leaving
+        re = self.re
+        im = self.im
+        for i in range(len(self.bins)):
+            r = re[i] + d
+            cs = self.cos[i]
+            sn = self.sin[i]
+            re[i] = r * cs - im[i] * sn
+            im[i] = r * sn + im[i] * cs
+
+    def amplitude(self, i:int)->float:
+        """Amplitude of the sinusoid at bins[i], in sample units... 0 until the window is full"""
+        if self.count < self.n:
+            return 0.0
+        return self.gain[i] * math.sqrt(self.re[i] * self.re[i] + self.im[i] * self.im[i])
+
+    def peak(self)->tuple:
+        """(bin index, amplitude) of the strongest bin"""
+        best = 0
+        best_amp = 0.0
+        for i in range(len(self.bins)):
+            a = self.amplitude(i)
+            if a > best_amp:
+                best = i
+                best_amp = a
+        return best, best_amp
+
+
+class SlidingRegression:
+    """
+    Linear regression over the last n evenly spaced samples, updated in O(1) per sample.
+    x is implicit: 1 for the oldest sample in the window up to n for the newest... same as dummy_x in linear_regression.
+
+    Keeps Σy, Σy² and Σxy.  When the window slides every x drops by one, so Σxy -= Σy before the new sample goes in at x = n.
+    Integer samples keep the sums exact; floats drift a little, so the sums are rebuilt from the window every n samples.
+    """
+    def __init__(self, n:int):
+        if n < 2:
+            raise ValueError("SlidingRegression window must be >= 2")
+        self.n = n
+        self.window = [0] * n       # own copy... needs the value leaving the window
+        self.head = 0               # slot of the oldest sample, once full
+        self.count = 0
+        self.sum_y = 0
+        self.sum_yy = 0
+        self.sum_xy = 0
+        self.since_resum = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, y)->None:
+        n = self.n
+        if self.count < n:
+            self.window[(self.head + self.count) % n] = y
+            self.count += 1
+            self.sum_xy += self.count * y
+        else:
+            y_old = self.window[self.head]
+            self.window[self.head] = y
+            self.head = (self.head + 1) % n
+            self.sum_xy += n * y - self.sum_y      # everyone's x drops by 1... including y_old, whose x goes 1 -> 0
+            self.sum_y  -= y_old
+            self.sum_yy -= y_old * y_old
+        self.sum_y  += y
+        self.sum_yy += y * y
+        self.since_resum += 1
+        if self.since_resum >= n:
+            self.resum()
+
+    def resum(self)->None:
+        """Rebuild the sums from the window... bounds float drift"""
+        sy = syy = sxy = 0
+        for k in range(self.count):
+            y = self.window[(self.head + k) % self.n]
+            sy  += y
+            syy += y * y
+            sxy += (k + 1) * y
+        self.sum_y = sy
+        self.sum_yy = syy
+        self.sum_xy = sxy
+        self.since_resum = 0
+
+    def result(self)->tuple[float, float, float, float, float]:
+        """(slope, intercept, std deviation, SD of residuals, r-squared)... as linear_regression, in O(1)"""
+        m = self.count
+        if m < 2:
+            raise ValueError("SlidingRegression needs >= 2 samples")
+        x_mean = (m + 1) / 2
+        y_mean = self.sum_y / m
+        sum_xx = m * (m * m - 1) / 12               # Σ(x - x̄)² for x = 1..m
+        sum_xy = self.sum_xy - x_mean * self.sum_y
+        sum_yy = self.sum_yy - self.sum_y * y_mean
+        if sum_yy < 0: sum_yy = 0                   # cancellation
+        slope = sum_xy / sum_xx
+        intercept = y_mean - slope * x_mean
+        ss_reg = slope * sum_xy                     # == slope² Σ(x - x̄)²
+        ss_dev = sum_yy - ss_reg
+        if ss_dev < 0: ss_dev = 0
+        r_squared = (ss_reg / sum_yy) if sum_yy != 0 else 0
+        std_dev   = math.sqrt(sum_yy / (m - 1))
+        sd_resids = math.sqrt(ss_dev / (m - 1))
+        return slope, intercept, std_dev, sd_resids, r_squared
@@ -4,17 +4,29 @@ import time  # type: ignore
 
 # --- Time Conversion ---
 
+_STD_OFFSET = 34200         # ACST, UTC+9:30
+_DST_OFFSET = 37800         # ACDT, UTC+10:30
+_dst_cache  = [0, -1, 0, 0] # year start, next year start, DST end, DST start... all UTC secs.  Empty until first call
+
+def _dst_bounds(secs: int) -> list:
+    """DST boundaries for the year secs falls in.  Worked out once a year... the mktime calls are the slow part"""
+    c = _dst_cache
+    if not (c[0] <= secs < c[1]):
+        year = time.localtime(secs)[0]
+        c[0] = time.mktime((year, 1, 1, 0, 0, 0, 0, 0, 0))
+        c[1] = time.mktime((year + 1, 1, 1, 0, 0, 0, 0, 0, 0))
+        c[2] = time.mktime((year, 4, (7 - (int(5 * year / 4 + 4)) % 7), 2, 0, 0, 0, 0, 0))
+        c[3] = time.mktime((year, 10, (7 - (int(year * 5 / 4 + 5)) % 7), 2, 0, 0, 0, 0, 0))
+    return c
+
+def local_offset(secs: int) -> int:
+    """Seconds to add to UTC for South Australian local time at secs"""
+    c = _dst_bounds(secs)
+    return _STD_OFFSET if c[2] < secs < c[3] else _DST_OFFSET
+
 def secs_to_localtime(secs: int) -> tuple:
     """Convert seconds since epoch to localtime tuple, handling DST for South Australia."""
-    tupltime = time.localtime(secs)
-    year = tupltime[0]
-    DST_end = time.mktime((year, 4, (7 - (int(5 * year / 4 + 4)) % 7), 2, 0, 0, 0, 0, 0))
-    DST_start = time.mktime((year, 10, (7 - (int(year * 5 / 4 + 5)) % 7), 2, 0, 0, 0, 0, 0))
-    if DST_end < secs < DST_start:
-        adj_time = time.localtime(secs + int(9.5 * 3600))
-    else:
-        adj_time = time.localtime(secs + int(10.5 * 3600))
-    return adj_time
+    return time.localtime(secs + local_offset(secs))
 
 # --- Formatting Helpers ---
 
@@ -32,13 +44,27 @@ def now_time_tuple() -> tuple:
     """Current local time tuple."""
     return secs_to_localtime(time.time())
 
+# formatted strings for the current second... most calls land in the same second as the last one
+_short_memo = [-1, ""]
+_long_memo  = [-1, ""]
+
 def now_time_short() -> str:
-    """Current time, short format."""
-    return format_time_short(now_time_tuple())
+    """Current time, short format.  Only reformatted when the second changes"""
+    secs = int(time.time())
+    m = _short_memo
+    if m[0] != secs:
+        m[1] = format_time_short(secs_to_localtime(secs))
+        m[0] = secs
+    return m[1]
 
 def now_time_long() -> str:
-    """Current time, long format."""
-    return format_time_long(now_time_tuple())
+    """Current time, long format.  Only reformatted when the second changes"""
+    secs = int(time.time())
+    m = _long_memo
+    if m[0] != secs:
+        m[1] = format_time_long(secs_to_localtime(secs))
+        m[0] = secs
+    return m[1]
 
 # --- Format from seconds ---
 
@@ -59,4 +85,130 @@ def calculate_variance(values)-> tuple:
     variance = squared_diff_sum / (n - 1)  # Using n-1 for sample variance
     # std_dev = sqrt(variance)    # don't really need std dev.. and import math
     
-    return mean, variance
\ No newline at end of file
+    return mean, variance
+
+# --- Allocation-free log lines ---
+
+def _put_padded(buf, pos: int, n: int, width: int) -> None:
+    """Non-negative n as exactly width zero-padded digits at buf[pos:]"""
+    i = pos + width
+    while i > pos:
+        i -= 1
+        buf[i] = 48 + n % 10
+        n //= 10
+
+class LineFormatter:
+    """
+    Builds one log line at a time in a preallocated bytearray... digits go straight in, no str objects made.
+    Chain the put_* calls after reset(), then end() returns the line as a memoryview slice for file.write.
+    The slice is only good until the next reset().
+
+    Give each writer its own formatter: timer callbacks can interrupt a task mid-line.
+    Size it for the longest line.  Anything that doesn't fit is counted in overflows, and a number that doesn't
+    fit shows as '#'s, so a short buffer is visible in the log rather than quietly losing a field.
+    """
+    def __init__(self, size: int = 96):
+        self.buf = bytearray(size)
+        self.mv = memoryview(self.buf)
+        self.pos = 0
+        self.overflows = 0                  # puts that didn't fit, since made
+        self._tsecs = -1
+        self._tlong = bytearray(b"0000/00/00 00:00:00")     # formatted now, redone when the second changes
+
+    def reset(self):
+        self.pos = 0
+        return self
+
+    def put_byte(self, c: int):
+        if self.pos < len(self.buf):
+            self.buf[self.pos] = c
+            self.pos += 1
+        else:
+            self.overflows += 1
+        return self
+
+    def put_bytes(self, b):
+        """bytes constants, or any buffer"""
+        n = len(b)
+        room = len(self.buf) - self.pos
+        if n > room:
+            n = room
+            self.overflows += 1
+        self.buf[self.pos:self.pos + n] = b[:n] if n < len(b) else b
+        self.pos += n
+        return self
+
+    def put_fixed(self, n: int, decimals: int, width: int = 0):
+        """
+        Integer n scaled down by 10^decimals, as f"{n / 10**decimals:{width}.{decimals}f}" would show it... without the float.
+        put_fixed(1234, 3) -> 1.234.  decimals=0 is a plain int
+        """
+        neg = n < 0
+        if neg:
+            n = -n
+        digits = 1
+        t = n
+        while t >= 10:
+            t //= 10
+            digits += 1
+        if digits <= decimals:              # always a digit before the point
+            digits = decimals + 1
+        size = digits + neg + (1 if decimals > 0 else 0)
+        end = self.pos + (width if width > size else size)
+        buf = self.buf
+        if end > len(buf):                  # doesn't fit... mark what room there is
+            self.overflows += 1
+            while self.pos < len(buf):
+                buf[self.pos] = 35          # '#'
+                self.pos += 1
+            return self
+        i = end
+        if decimals > 0:
+            for _ in range(decimals):
+                i -= 1
+                buf[i] = 48 + n % 10
+                n //= 10
+            i -= 1
+            buf[i] = 46                     # '.'
+        while True:                         # at least one digit before the point
+            i -= 1
+            buf[i] = 48 + n % 10
+            n //= 10
+            if n == 0:
+                break
+        if neg:
+            i -= 1
+            buf[i] = 45                     # '-'
+        while i > self.pos:
+            i -= 1
+            buf[i] = 32
+        self.pos = end
+        return self
+
+    def put_int(self, n: int, width: int = 0):
+        """n right-aligned in width, as f"{n:{width}}" """
+        return self.put_fixed(n, 0, width)
+
+    def put_now_long(self):
+        """Current local time, YYYY/MM/DD HH:MM:SS... as now_time_long()"""
+        secs = int(time.time())
+        tl = self._tlong
+        if secs != self._tsecs:
+            t = secs_to_localtime(secs)
+            _put_padded(tl, 0, t[0], 4)
+            _put_padded(tl, 5, t[1], 2)
+            _put_padded(tl, 8, t[2], 2)
+            _put_padded(tl, 11, t[3], 2)
+            _put_padded(tl, 14, t[4], 2)
+            _put_padded(tl, 17, t[5], 2)
+            self._tsecs = secs
+        return self.put_bytes(tl)
+
+    def end(self):
+        """Add the newline, and return the line.  A full line loses its last byte to the newline... an overflow"""
+        if self.pos < len(self.buf):
+            self.pos += 1
+        else:
+            self.overflows += 1
+        self.buf[self.pos - 1] = 10
+        return self.mv[:self.pos]
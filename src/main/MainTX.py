@@ -27,9 +27,12 @@ from Pump import Pump
 from Tank import Tank
 from TMErrors import TankError
 from TimerManager import TimerManager
-from stats import linear_regression
-from ringbuffer import RingBuffer, DuplicateDetectingBuffer
-from utils import now_time_short, now_time_long, format_secs_short, format_secs_long, now_time_tuple
+from stats import theil_sen, SlidingRegression, SlidingMinMax, MedianFilter, P2Quantile, Cusum, GoertzelBank, ring_mean
+from ringbuffer import RingBuffer, DuplicateDetectingBuffer, NumericRingBuffer, SampleRing
+from rrd import RoundRobinArchive
+from filters import EWMA, shift_for_window
+import snapshot
+from utils import now_time_short, now_time_long, format_secs_short, format_secs_long, now_time_tuple, LineFormatter
 from TM_Protocol import *
 # from ringbuf_queue import RingbufQueue
 
@@ -116,16 +119,29 @@ EVENTRINGSIZE       = 30            # max log ringbuffer length
 SWITCHRINGSIZE      = 20
 KPARINGSIZE         = 20            # size of ring buffer for pressure logging... NOT for calculation of average
 ERRORRINGSIZE       = 20            # max error log ringbuffer length
-HI_FREQ_RINGSIZE    = 128           # for high frequency pressure logging.  At 1 Hz that's 2 minutes of data... increase for graphing
+HI_FREQ_RINGSIZE    = 1024          # for high frequency pressure logging.  At 1 Hz that's 17 minutes of data, 2 bytes per sample
 DEPTHRINGSIZE       = 12            # since adding fast_average in critical_states, this no longer is a concern, but is used for ROC SMA calc
 DEPTHGRAPHSIZE      = 128           # for plotting depth
 PPRINGSIZE          = 16            # this will store 30 status changes...
+RRD_MINUTES         = 240           # round-robin archive: 1-minute low/mean/high for 4 hours...
+RRD_HOURS           = 168           # ... hourly for a week.  ~4 KB per archive, all allocated at init.  No raw tier: the live rings have that
+RRD_VIEW_SECS       = 24 * 3600     # History menu shows the finest archive tier spanning this... hourly, newest first
+RRD_DUMP            = False         # write the archives to the event log at shutdown... ~450 lines, so only when wanted
+RRD_DUMP_MINUTES    = 60            # minute summaries written when dumping... all the hourly ones go
+SNAPSHOT_FILE       = "rings.snap"  # binary snapshot of ring buffers, for warm restart
+SNAPSHOT_PERIOD     = 600           # seconds between snapshots... also written on shutdown
+SNAPSHOT_MAX_AGE    = 1800          # seconds... older snapshots are ignored at boot
 
 # endregion
 # region COUNTERS
 # Counters... for averaging or event timing
 HI_FREQ_AVG_COUNT   = 7             # for high frequency pressure check
+KPA_FILTER_LEN      = 5             # median/MAD spike filter window, kPa samples
+KPA_SPIKE_MIN       = 20            # kPa jumps up to this are never treated as spikes
 ZONE_AVG_COUNT      = 12            # for zone pressure calculation
+ZONE_SETTLE_KPA     = 15            # max-min over the ZONE_AVG_COUNT window must be within this before the zone is set...
+ZONE_SETTLE_TRIES   = 3             # but don't wait for ever
+DIAG_KPA_WINDOW     = 60            # DIAG display HI/LO... extremes over this many recent samples
 AVG_KPA_COUNT       = 30
 LOOKBACKCOUNT       = 75            # for looking back at pressure history... to see if kPa drop is normal or not
 HFPAD               = 10            # avoid looking at last 10 seconds for LR slope calc
@@ -135,6 +151,17 @@ STABLE_KPA_COUNT    = 75            # time to allow kPa to settle
 FAST_AVG_COUNT      = 3             # for checking critical pressure states
 # D_STD_DEV_COUNT     = 10            # standard deviation calcs
 P_STD_DEV_COUNT     = 60
+KPA_PRIOR_LAG       = LOOKBACKCOUNT - P_STD_DEV_COUNT + HFPAD + 1     # newest sample in the "prior" kPa regression window, back from now
+CUSUM_K             = 1.0           # kPa CUSUM allowance, SDs... steps under about 2 SD are ignored
+CUSUM_H             = 6.0           # and threshold, SDs.  ~1 false alarm per 10^5 samples of white noise; a 5 SD drop signals in 2-3 samples
+CUSUM_LEARN         = 60            # stable samples each run to learn the zone's reference kPa
+CUSUM_TRACK         = 1 / 128       # then the reference follows slow drift (tank head), ~2 minute time constant
+CUSUM_MIN_DROP      = 8             # kPa... a signalled drop estimated smaller than this is logged, not acted on
+OSC_WINDOW          = 64            # kPa oscillation detector window, samples
+OSC_PERIODS         = (4, 8, 16)    # periods watched, secs... must divide OSC_WINDOW
+OSC_KPA_AMPL        = 4             # oscillation amplitude alarm, kPa.  XS P SDEV needs about 5.7 (SD of a sine is A/1.414)
+OSC_PERSIST         = 5             # consecutive samples over OSC_KPA_AMPL before raising it
+OSC_DIFF_CLIP       = 2 * OSC_KPA_AMPL  # kPa... sample to sample changes are clipped to this, so a step drop doesn't read as oscillation
 ZONE_DELAY          = 6             # seconds to wait AFTER setting avg_kpa before determining zone.  Could be zero ??
 AVG_KPA_DELAY       = AVG_KPA_COUNT + 5   # seconds to wait before taking average pressure, ensures enough values recorded
 # endregion
@@ -152,10 +179,11 @@ kpa_sensor_found    = True          # set to True if pressure sensor is detected
 avg_kpa_set         = False         # set to True if kpa average is set
 kpa_peak            = 0             # track peak pressure for each zone
 kpa_low             = 1000
+xs_raw_count        = 0             # consecutive raw (unfiltered) kPa reads over MAXPRESSURE
+zone_settle_tries   = 0             # set_zone retries waiting for kPa to settle, since pump ON
 DEPTH_SD_MAX        = 3            # Optimisation: calc SD of residuals after removing linear trend... it matters! Then reduce 5 to about 2!
 PRESS_SD_MAX        = 4             # test this too.  Was 3.6 before I changed to calc on residuals... not bare kPa
 kPa_sd_multiple     = 3             # 10X so that is 2.5 std devs ... a LOT of wiggle room.  Divide by 10 later...
-hf_xvalues          = [i for i in range(HI_FREQ_RINGSIZE)]  # 
 dr_xvalues          = [i for i in range(DEPTHRINGSIZE)]
 dr_yvalues          = [0 for i in range(DEPTHRINGSIZE)]
 # endregion
@@ -305,10 +333,16 @@ last_logged_depth   = 0
 last_logged_kpa     = 0
 LOG_MIN_DEPTH_CHANGE_MM  = 10       # reset after test run. to save space... only write to file if significant change in level
 LOG_MIN_KPA_CHANGE  = 10            # update after pressure sensor active
-PP_SWITCH_NOISE     = 6             # ignore depth reading if instant change is more than this...
+PP_SWITCH_NOISE     = 6             # depth jumps up to this are never treated as spikes, whatever the MAD says
+DEPTH_FILTER_LEN    = 5             # median/MAD spike filter window, depth readings
 
 level_init          = False 		# to get started
 
+# one per writer... timer callbacks can interrupt a task mid-line.  Lines built in place, see utils.LineFormatter
+# Only for the per-sample lines: the occasional ones (alarms, tank log) stay f-strings, they need a str anyway
+hf_fmt              = LineFormatter(48)
+pp_fmt              = LineFormatter(32)
+
 # PP_ANOMALY_PERIOD   = 30*60         # seconds... not ms
 # endregion
 # region PHYSICAL_DEVICES
@@ -493,6 +527,8 @@ Ring buffer entry format:  (timestamp, state)
     timestamp : int  - Unix epoch seconds (from time.time())
     state     : str  - "ON" or "OFF"
 
+Input is a chronological RingWindow (oldest first), eg pp_ring.window()
+
 Typical problem signature
     Pump ON  ~10 s  → pressurises line
     Pump OFF ~1-2 min → line slowly bleeds down
@@ -502,8 +538,7 @@ Usage
 -----
     from pump_cycle_detect import detect_pump_cycling
 
-    # head is the index where the NEXT write will go (i.e. oldest data is there)
-    result = detect_pump_cycling(ring_buffer, head, len(ring_buffer))
+    result = detect_pump_cycling(pp_ring.since(time.time() - 3600))
     if result["alert"]:
         print("Suspicious cycling detected:", result)
 """
@@ -548,17 +583,15 @@ def _int_sqrt(n):
     return x
 
 @print_args
-def _extract_cycles(buf, head, buf_len, now, lookback, max_on, min_off):
+def _extract_cycles(win, now, lookback, max_on, min_off):
     """
-    Walk the ring buffer in chronological order (oldest → newest) and return
+    Walk the ring window in chronological order (oldest → newest) and return
     a list of complete ON/OFF cycles that fall within the lookback window AND
     match the suspicious short-ON / long-OFF shape.
 
-    head    : index where the NEXT write will go; oldest data lives here.
-    buf_len : total capacity of the ring buffer.
-
-    Iteration uses (head + k) % buf_len so timestamps always increase,
-    avoiding spurious negative diffs at the wrap-around point.
+    win     : RingWindow, oldest first.  The ring does the wrap-around, so
+              timestamps always increase... no spurious negative diffs.
+              Pass ring.since(cutoff) and only the lookback span gets walked.
 
     Each returned cycle is a dict:
         on_s       - how long the pump ran (seconds)
@@ -568,22 +601,18 @@ def _extract_cycles(buf, head, buf_len, now, lookback, max_on, min_off):
     """
     cutoff = now - lookback
     cycles = []
-
-    # Build a flat chronological index list for clean look-ahead.
-    # We only need indices, not a copy of the data.
-    def entry(n):
-        return buf[(head + n) % buf_len]
+    win_len = len(win)
 
     k = 0
-    while k < buf_len - 2:
-        ts_on, state_on = entry(k)
+    while k < win_len - 2:
+        ts_on, state_on = win[k]
 
         # Skip until we find an ON event inside the lookback window
         if state_on != "ON" or ts_on < cutoff:
             k += 1
             continue
 
-        ts_off, state_off = entry(k + 1)
+        ts_off, state_off = win[k + 1]
         if state_off != "OFF":      # two ONs in a row  - data gap, skip
             k += 1
             continue
@@ -593,7 +622,7 @@ def _extract_cycles(buf, head, buf_len, now, lookback, max_on, min_off):
             k += 1
             continue
 
-        ts_next_on, state_next_on = entry(k + 2)
+        ts_next_on, state_next_on = win[k + 2]
         if state_next_on != "ON":   # still off  - skip
             k += 1
             continue
@@ -636,9 +665,7 @@ def _coefficient_of_variation_pct(values):
 # ---------------------------------------------------------------------------
 
 def detect_pump_cycling(
-    buf,
-    head,
-    buf_len,
+    win,
     now=None,
     min_cycles=_DEF_MIN_CYCLES,
     max_on_s=_DEF_MAX_ON_S,
@@ -651,13 +678,8 @@ def detect_pump_cycling(
 
     Parameters
     ----------
-    buf           : list/array of (timestamp: int, state: str)
-                    Raw ring buffer — may be partially filled or wrapped.
-    head          : int
-                    Index where the NEXT write will go.  The oldest valid
-                    entry is at this index (it was the last one overwritten).
-    buf_len       : int
-                    Total allocated capacity of the ring buffer.
+    win           : RingWindow of (timestamp: int, state: str), oldest first
+                    eg pp_ring.window() — may be partially filled.
     now           : int | None
                     Current time in seconds (time.time()).  Defaults to the
                     timestamp of the most-recently written entry.
@@ -679,15 +701,13 @@ def detect_pump_cycling(
         cycles      : list   - raw cycle dicts (on_s, off_s, period_s, ts_start)
         reason      : str    - human-readable explanation
     """
-    if buf_len < 2:
+    if len(win) < 2:
         return _no_alert("Buffer too small", [])
 
     if now is None:
-        # Most-recently written entry is one step behind head
-        now = buf[(head - 1) % buf_len][0]
-
+        now = win.time(len(win) - 1)        # most-recently written entry is last in a chronological window
 
-    cycles = _extract_cycles(buf, head, buf_len, now, lookback_s, max_on_s, min_off_s)
+    cycles = _extract_cycles(win, now, lookback_s, max_on_s, min_off_s)
 
     lcd.setCursor(0, 1)
     lcd.printout(f'DPC: {len(cycles)} cs')
@@ -887,6 +907,13 @@ zone_pressure_dict = {
     P9: (0, 0, 0, 0),
     '???': (0, 0, 0, 0)
 }
+# running kPa distribution per zone while pumping... P² estimators, five markers each, no samples kept
+ZONE_QUANTILES = (0.05, 0.5, 0.95)
+zone_kpa_quantiles = {z: tuple(P2Quantile(q) for q in ZONE_QUANTILES) for z in zone_pressure_dict}
+# per-zone kPa step detectors... reference mean relearned each run, noise SD pooled across runs of that zone
+zone_kpa_cusum = {z: Cusum(CUSUM_K, CUSUM_H, CUSUM_LEARN, track=CUSUM_TRACK) for z in zone_pressure_dict}
+cusum_zone = None                   # zone whose detector is running this pump run... None until the first stable sample
+osc_count = 0                       # consecutive samples with oscillation over OSC_KPA_AMPL
 zone_runtime_dict = {
     P0:0,
     P1:0,
@@ -1383,6 +1410,23 @@ def show_house():
         lcd.setCursor(0,1)
         lcd.printout("No PP switches")
 
+def show_archive(list_name, archive, empty_txt):
+    tier = archive.select(RRD_VIEW_SECS)            # periods only show once they close
+    if len(tier) > 0:
+        navigator.set_buffer(list_name, tier)
+        navigator.set_display_list(list_name)
+        navigator.mode           = MenuNavigator.VIEWRING
+        navigator.goto_first()
+    else:
+        lcd.setCursor(0,1)
+        lcd.printout(empty_txt)
+
+def show_kpa_history():
+    show_archive(MenuNavigator.KPAHIST, kpa_archive, "No kPa history")
+
+def show_depth_history():
+    show_archive(MenuNavigator.DEPTHHIST, depth_archive, "No depth history")
+
 def show_space():
     free = free_space()
     lcd.setCursor(0,1)
@@ -1480,6 +1524,12 @@ def shutdown()->None:
             dump_pump_arg(presspump)
 
     dump_zone_peak()
+    if RRD_DUMP:
+        dump_archives()
+    for name, fmt in (("hf", hf_fmt), ("pp", pp_fmt)):
+        if fmt.overflows > 0:               # a field too wide for its LineFormatter... shows as '#' in that log
+            ev_log.write(f"{now_time_long()} {name} log: {fmt.overflows} fields overflowed the line buffer\n")
+    save_snapshot()                         # warm start next time
 
     if event_ring.index > -1:
         ev_log.write("\nevent_ring dump:\n")
@@ -1763,22 +1813,11 @@ def make_more_space()->None:
         lcd.printout(f'Saved {reclaimed} Kb')
 
 def dump_context():
-    if error_ring.index > -1:
-        entry  = error_ring.buffer[error_ring.index]
-        tmp = entry[1]              # entry is either an int, or a string consisting of an int followed by a repeat count
-        if type(tmp) == str:
-            if len(tmp) > 0:
-                er_str = tmp.split(" ")
-                # print(f'{er_str=}')             # should look like [code_str, repeat_string_str]
-                enum_str = er_str[0]
-                # print(f'{enum_str=}')
-                rep_count_str = er_str[2]       # looks like 'x3)' ... slice off 1st and last chars to get count, convert to int 
-                rep_count = int(rep_count_str[1:-1])
-                tmp = int(enum_str)
-            # tmp = int(tmp.split(" ")[0])
-        else:
-            tmp=int(tmp)
-        e_code = errors.get_code(tmp)
+    entry = error_ring.latest()         # (ts, code, repeat count)
+    if entry is not None:
+        e_code = errors.get_code(entry[1])
+        if entry[2] > 1:
+            e_code = f"{e_code} x{entry[2]}"
     else:
         e_code = ""
     logstr = f"{now_time_long()} Context Dump\n{op_mode=}\n{borepump.num_switch_events=}\n" \
@@ -1944,6 +1983,8 @@ new_menu = {
           { Title_Str: "Pressure",      Action_Str: show_pressure},
           { Title_Str: "Depth",         Action_Str: show_depth},
           { Title_Str: "House",         Action_Str: show_house},
+          { Title_Str: "kPa Hourly",    Action_Str: show_kpa_history},
+          { Title_Str: "Depth Hourly",  Action_Str: show_depth_history},
           { Title_Str: "Errors",        Action_Str: show_errors},
           { Title_Str: "Stats",         Action_Str: show_duty_cycle},
           { Title_Str: "Go Back",       Action_Str: my_go_back}
@@ -2443,36 +2484,18 @@ def get_fill_state(d):
         tmp = housetank.fill_states[0]
     return tmp
 
-def calc_SMA(buff:list)-> float:
-    dsum = 0
-    n = 0
-    for tup in buff:
-        dval = tup[1]       # life's different now with ringbuffer...
-        if dval > 0:
-            dsum += dval
-            n += 1
-    if n > 0:
-        return dsum / n
-    else:
-        return 0.0
-  
 def calc_average_HFpressure(offset_back:int, length:int)->float:
     """
     This is a cut-down version of mean_stdev... and should probably be replaced.
-    It is also confusing, as it is NOT the same semantics... offset is RELATIVE to hi_freq_kpa_index !!!
-    And ringsize is built-in, not a param
+    offset_back is RELATIVE to the newest sample: 0 averages the latest length readings.
 
-    Finally, note it does some checking on mod_index not done elsewhere
+    Finally, note it does some checking on offsets not done elsewhere
     """
 
     if offset_back + length > HI_FREQ_RINGSIZE:     # then we will wrap back over previously used values
         event_ring.add(f'WARNING: Invalid params {offset_back + length} in calc_average_HFpressure')
 
-    p = 0
-    for i in range(length):
-        mod_index = (hi_freq_kpa_index - offset_back - i - 1) % HI_FREQ_RINGSIZE  # change to average hi_freq_kpa readings
-        p += hi_freq_kpa_ring[mod_index]
-    return p/length
+    return ring_mean(hi_freq_kpa_ring.samples, length, hi_freq_kpa_ring.index - offset_back, HI_FREQ_RINGSIZE, fixed_point=True)   # integer kPa... int sum, one divide
 
 def get_tank_depth():
     global tank_is
@@ -2491,9 +2514,15 @@ def get_tank_depth():
     tank_is = get_fill_state(d)
 
 def set_zone(timer: Timer):
-    global zone, zone_minimum, zone_maximum, kpa_peak, time_peak, kPa_sd_multiple
+    global zone, zone_minimum, zone_maximum, kpa_peak, time_peak, kPa_sd_multiple, zone_settle_tries
 
     if avg_kpa_set:             # only do this if we have a valid average
+        spread = kpa_minmax.spread(ZONE_AVG_COUNT)
+        if spread > ZONE_SETTLE_KPA and zone_settle_tries < ZONE_SETTLE_TRIES:     # still moving... an average now could land in the wrong zone
+            zone_settle_tries += 1
+            ev_log.write(f"{now_time_long()} set_zone: kPa not settled ({spread=}), retry {zone_settle_tries}\n")
+            timer.init(period=ZONE_DELAY * 1000, mode=Timer.ONE_SHOT, callback=set_zone)   # type: ignore
+            return
         zone_startup = round(calc_average_HFpressure(0, ZONE_AVG_COUNT))  # get average of last several readings.
 
         new_zone, zone_minimum, zone_maximum, zsdm  = get_zone_from_list(zone_startup)
@@ -2522,12 +2551,12 @@ def set_average_kpa(timer: Timer):
             average_kpa = round(tmp, 2)
             print("set_average_kpa callback: Average kPa set: ", average_kpa)
             avg_kpa_set = True
-            kpa_ring.add(average_kpa)         # add to ring buffer for later use
+            kpa_ring.add(int(average_kpa))    # add to ring buffer for later use.  Numeric ring... ints only
             if DEBUGLVL > 0: event_ring.add(f'Avg kpa set: {average_kpa}')
             zone_timer = Timer(period=ZONE_DELAY * 1000,    mode=Timer.ONE_SHOT, callback=set_zone)  # type:ignore
         else:
             print("set_average_kpa: Yikes!! Buffer has data, but average_kpa is 0")
-            for i in range(5): print(f"{hi_freq_kpa_ring[(hi_freq_kpa_index - i - 1) % HI_FREQ_RINGSIZE]} ", end=" ")
+            for i in range(5): print(f"{hi_freq_kpa_ring.at_offset(i)} ", end=" ")
     else:
         logstr = f'{now_time_long()} set_average_kpa: ({read_count_since_ON=}) <= AVG_KPA_COUNT.  Should not happen'
         print(logstr)
@@ -2555,34 +2584,21 @@ def updateData():
     publish_temperature(client)
     publish_kPa(client)
 
-#  OK... try to filter out pressure pump switching noise..only matters if filling tank, ie HT zone
-    # last_reading = housetank.depth
+#  Median/MAD spike filter... covers pressure pump switching noise, and any other one-off bad reading
     prev_depth = housetank.depth
-    if zone == P2:                                      # that's HT...
-        if pp_ring.index > -1:
-            last_PP_event = pp_ring.buffer[pp_ring.index]
-            recent_switch = last_PP_event[1] == "ON" and (time.time() - last_PP_event[0]) < config_dict[DELAY]    # looks like pump-ON in the current iteration...
-        else:
-            recent_switch = False
-        if recent_switch:
-            if depth_ring.index > -1:
-                prev_depth = depth_ring.buffer[depth_ring.index][1]      # beware... tuples lurk here
-            else:
-                prev_depth = housetank.depth            # fudge it if we have no prior value
-
-            change_since_last = abs(prev_depth - housetank.depth)
-            if rec_num > 1 and change_since_last > PP_SWITCH_NOISE:    # Why ref rec_num?  otherwise we are forever stuck on zero...
-                if DEBUGLVL > 0:
-                    # prev_depth = depth_ring.buffer[(depth_ring.index - 1) % len(depth_ring.buffer)][1]      # beware... tuples lurk here
-                    lstr = f"{now_time_long()} fudging depth: {housetank.depth:4} {prev_depth=:4} {change_since_last=} last_depth={housetank.last_depth:4} RB={depth_ring.buffer[depth_ring.index][1]:4} Updating from {housetank.depth} to {prev_depth}"
-                    print(lstr)
-                    ev_log.write(lstr + '\n')
-                housetank.depth = prev_depth                # ignore this reading, maintain prev value
-                                                            # TODO check if subsequent refs are now a problem...
+    housetank.depth, spike = depth_filter.filter(prev_depth)
+    if spike and DEBUGLVL > 0:
+        lstr = f"{now_time_long()} depth spike: {prev_depth:4} replaced by median {housetank.depth:4} ({depth_filter.outliers} so far)"
+        print(lstr)
+        ev_log.write(lstr + '\n')
 
     # depth_ring.add(last_reading)
-    depth_ring.add(housetank.depth)
-    sma_depth = calc_SMA(depth_ring.buffer)         # this calculates average of non-zero values... regardless of how many entries in the ring
+    if housetank.depth > 0:                         # zero or failed reads stay out of the ring... calc_SMA used to skip them, and the ring mean can't
+        depth_ring.add(housetank.depth)
+        depth_archive.add(housetank.depth)
+    elif DEBUGLVL > 0:
+        print(f"depth {housetank.depth} not added to depth_ring")
+    sma_depth = depth_ring.mean()                   # running aggregate... only counts entries actually in the ring, so no zero padding to skip
     time_factor = config_dict[DELAY] / 60           # dont move this - DELAY may be changed on the fly
     housetank.depth_ROC = int((sma_depth - housetank.last_depth) / time_factor)	# ROC in mm/minute.  Save negatives also...
     depth_ROC_ring[depth_ROC_index] = housetank.depth_ROC  # do this right... plot depth_ROC, not depth
@@ -2592,19 +2608,18 @@ def updateData():
     depth_str = f"{housetank.depth/1000:.2f}m " + tank_is
 
     if kpa_sensor_found and read_count_since_ON >= AVG_KPA_COUNT:
-        tmp = round(calc_average_HFpressure(0, AVG_KPA_COUNT), 2)  # get average of last AVG_KPA_COUNT readings.
+        tmp = round(kpa_slow.value(), 2)    # smoothed over about AVG_KPA_COUNT readings... restarted at pump ON
         if tmp > 0:
             average_kpa = int(tmp)
             avg_kpa_set = True
             kpa_ring.add(average_kpa)         # kpa_ring values are ONLY used to view history via menu... no other function
             # print(f"Average kPa set in UpdateData to: {average_kpa}")
         else:
-            dstr = f"{now_time_long()} Yikes!! RCSO {read_count_since_ON}, but average_kpa(tmp) is {tmp}  {hi_freq_kpa_index=}"
+            dstr = f"{now_time_long()} Yikes!! RCSO {read_count_since_ON}, but average_kpa(tmp) is {tmp}  {hi_freq_kpa_ring.index=}"
             print(dstr)
-            for i in range(5): print(f"{hi_freq_kpa_ring[(hi_freq_kpa_index - i - 1) % HI_FREQ_RINGSIZE]} ", end=" ")
+            for i in range(5): print(f"{hi_freq_kpa_ring.at_offset(i)} ", end=" ")
 
-    prev_index = (hi_freq_kpa_index - 1) % HI_FREQ_RINGSIZE     # because hi_freq_kpa_index refers to pos to write next value
-    pressure_str = f'P {hi_freq_kpa_ring[prev_index]:>3} Av {int(average_kpa):>3} {zone:3}'
+    pressure_str = f'P {hi_freq_kpa_ring.at_offset(0):>3} Av {int(average_kpa):>3} {zone:3}'
       
 
 def get_pressure():
@@ -2632,14 +2647,22 @@ def radio_time(local_time):
     return local_time + clock_adjust_ms
 
 def reset_state():
-    global read_count_since_ON, stable_pressure, avg_kpa_set, kpa_peak, kpa_low, drop_hiwat
+    global read_count_since_ON, stable_pressure, avg_kpa_set, kpa_peak, kpa_low, drop_hiwat, zone_settle_tries, cusum_zone, osc_count
+    global xs_raw_count
 
     read_count_since_ON = 0
+    zone_settle_tries = 0
     stable_pressure = False
     avg_kpa_set = False             # TODO Should I also set hf_kpa_index to 0 ??
     kpa_peak = 0                    # if not, potential for looking at OLD values when I refer to previous buffer value.  Think this through
     kpa_low = 1000
     drop_hiwat = 0
+    cusum_zone = None
+    osc_count = 0
+    kpa_osc.reset()                 # window restarts with the run... no pre-ON pressure in it
+    xs_raw_count = 0
+    kpa_medium.reset()              # smoothers restart with the run... don't carry in the pressure from before ON
+    kpa_slow.reset()                # average_kpa is per run
 
 def borepump_ON(reason:str):        # REQUEST ON... TBC.  ALL actions deferred until confirmed in P_A_P
     system.on_event(SimpleDevice.SM_EV_ON_REQ)
@@ -2657,6 +2680,24 @@ def dump_zone_peak()->None:
             lstr = f"{format_secs_long(zone_pressure_dict[z][0])}  Zone {z:<3}: peak {zone_pressure_dict[z][1]:3} kPa {zone_pressure_dict[z][2]:3} seconds after ON, zone_lo {zone_pressure_dict[z][3]:3}"
             print(lstr)
             ev_log.write(lstr + "\n")
+        ests = zone_kpa_quantiles[z]
+        if ests[0].count > 0:
+            qstr = " ".join(f"P{round(e.p * 100)} {e.value():3.0f}" for e in ests)
+            lstr = f"{' ':19}  Zone {z:<3}: running kPa {qstr} ({ests[0].count} samples)"
+            print(lstr)
+            ev_log.write(lstr + "\n")
+
+def dump_archives()->None:
+    """Hourly low/mean/high for the last week, and the last RRD_DUMP_MINUTES minutes, of kPa and depth"""
+    for name, archive in (("kPa", kpa_archive), ("depth", depth_archive)):
+        for tier, count in ((archive.hours, None), (archive.minutes, RRD_DUMP_MINUTES)):
+            recent = tier.window(count)
+            if len(recent) == 0:
+                continue
+            ev_log.write(f"\n{name} {tier.period}s summaries (start, low, mean, high):\n")
+            for k in range(len(recent)):
+                ts, low, mean, high = recent[k]
+                ev_log.write(f"{format_secs_long(ts)} {low:4} {mean:4} {high:4}\n")
 
 def raiseAlarm(param, val):
 
@@ -2772,48 +2813,118 @@ def make_dr_lists():
     global dr_xvalues, dr_yvalues
     offset_secs = 1762484000            # translate time axis... or we hit overflow issues
 
-    start = depth_ring.index
-    for i in range(DEPTHRINGSIZE):
-        modidx = (start - i) % DEPTHRINGSIZE
-        d_tup = depth_ring.buffer[modidx]       # get tuple from ring
-        dr_xvalues[i] = d_tup[0] - offset_secs  # should be timestamp part of tuple
-        dr_yvalues[i] = d_tup[1]                # should be depth 
+    recent = depth_ring.last(DEPTHRINGSIZE)     # newest first, straight off the ring columns... no tuples
+    n = len(recent)
+    for i in range(n):
+        dr_xvalues[i] = recent.time(i) - offset_secs
+        dr_yvalues[i] = recent.value(i)
+    for i in range(n, DEPTHRINGSIZE):           # ring not full yet... don't leave stale points from an earlier fill
+        dr_xvalues[i] = 0
+        dr_yvalues[i] = 0
+    return n
    
+def check_kpa_drop()->None:
+    """
+    Compare average kPa now with LOOKBACKCOUNT secs ago, allowing for the prior trend and noise.
+    Called from read_pressure on EVERY sample... kpa_lr_prior keeps the regression O(1), so no waiting for the main loop.
+    Same gates as checkForAnomalies used: pump ON, stable pressure, average kPa set, enough readings since ON.
+    """
+    global drop_hiwat
+
+    if not (borepump.state and kpa_sensor_found and stable_pressure and avg_kpa_set) or op_mode == OP_MODE_MAINT:
+        return
+    if read_count_since_ON <= (LOOKBACKCOUNT + HI_FREQ_AVG_COUNT):
+        return
+    try:
+        # NOTE: calc_average_HFpressure behaves differently to other stats methods lin_reg and mean_stddev
+        av_p_prior  = calc_average_HFpressure(LOOKBACKCOUNT, HI_FREQ_AVG_COUNT) # get average of readings LOOKBACK seconds ago.
+        av_p_now    = calc_average_HFpressure(0, HI_FREQ_AVG_COUNT)             # zero offset == immediately prior values
+        actual_pressure_drop = round(av_p_prior - av_p_now, 2)     # Important!  Avoid rounding errors.. avg drop of 0.3 on HT triggered alarm without int()!
+        # if isRapidDrop(LOOKBACKCOUNT, expected_drop):   # check for rapid drop... if so, then set alarm and turn off pump
+        # NOTE: the prior window is CRITICAL!!  we need to do LR on the data BEFORE pressure dropped... and NOT include the last 7 seconds
+        k_slope, _, _, prior_stdev_Press, r2 = kpa_lr_prior.result()      # window ends KPA_PRIOR_LAG samples back... padding so the last 10 secs don't count
+        slope_drop = round(abs(min(k_slope, 0)) * LOOKBACKCOUNT, 2)     # changed from incorrect P_STD_DEV_COUNT 19/7/25
+        SD_drop    = round(prior_stdev_Press * kPa_sd_multiple, 1)
+        max_drop   = slope_drop + SD_drop
+        if actual_pressure_drop > drop_hiwat:
+            drop_hiwat = actual_pressure_drop
+        if actual_pressure_drop > max_drop:         # replaced zone=specific const with calculated value from linreg
+            kpa_drop_alarm(f"Exceeds max drop:{max_drop:.1f} {k_slope=:.4f} {r2=:.3f} {slope_drop=:.1f} {SD_drop=:.1f} {zone=}", actual_pressure_drop)
+    except Exception as e:
+        ex_str = f'{now_time_long()} check_kpa_drop exception: {e}\n'
+        ev_log.write(ex_str)
+        print(ex_str)
+
+def kpa_drop_alarm(detail:str, drop)->None:
+    """PRESSUREDROP alarm... beep now, then kpadrop_cb turns the pump off.  Once only, while the timer is pending"""
+    if op_mode == OP_MODE_DISABLED or timer_mgr.is_pending(KPA_DROP_TIMER_NAME):
+        return
+    runtime = time.time() - last_ON_time
+    _, H, M, S = secs_to_DHMS(runtime)
+    run_str = f'{H}:{M:02}:{S:02}'
+    # raiseAlarm(f"Pressure DROP after {runmins}:{runseconds:02}. Expected:{expected_drop}", actual_pressure_drop)
+    raiseAlarm(f"kPa DROP {run_str} after ON  {detail}", drop)
+    error_ring.add(TankError.PRESSUREDROP)
+    beeper.value(1)                              # this might change... to ONLY if not in TWM/IRRIGATE    
+    # kpa_drop_timer = Timer(period=ALARMTIME * 1000, mode=Timer.ONE_SHOT, callback=kpadrop_cb)
+    timer_mgr.create_timer(KPA_DROP_TIMER_NAME, ALARMTIME * 1000, kpadrop_cb)
+
+def check_kpa_oscillation()->None:
+    """
+    Pressure hunting or water hammer shows as a sinusoid at one of OSC_PERIODS.  Raise KPA_OSCILLATION once per episode,
+    when the strongest bin has stayed over OSC_KPA_AMPL for OSC_PERSIST samples... well before the residual SD gets to XS P SDEV.
+    """
+    global osc_count
+
+    if not (borepump.state and kpa_sensor_found and stable_pressure) or op_mode == OP_MODE_MAINT:
+        osc_count = 0
+        return
+    if timer_mgr.is_pending(KPA_DROP_TIMER_NAME):     # a drop is already being dealt with... its edge isn't oscillation
+        osc_count = 0
+        return
+    i, ampl = kpa_osc.peak()
+    if ampl <= OSC_KPA_AMPL:
+        osc_count = 0
+        return
+    osc_count += 1
+    if osc_count == OSC_PERSIST:
+        raiseAlarm(f"kPa OSC {OSC_PERIODS[i]}s {zone=}", ampl)
+        error_ring.add(TankError.KPA_OSCILLATION)
+
+def check_kpa_cusum(kpa:int)->None:
+    """
+    Per-sample two-sided CUSUM on kPa, against this zone's reference.  A drop goes through the same alarm as check_kpa_drop,
+    usually a few samples after the step rather than waiting for two averages LOOKBACKCOUNT apart to separate.
+    """
+    global cusum_zone
+
+    if not (borepump.state and kpa_sensor_found and stable_pressure and avg_kpa_set) or op_mode == OP_MODE_MAINT:
+        return
+    detector = zone_kpa_cusum.get(zone)
+    if detector is None:
+        return
+    if zone != cusum_zone:                  # first stable sample this run, or the zone just changed... relearn its level
+        detector.restart()
+        cusum_zone = zone
+    step = detector.add(kpa)
+    if step < 0 and -detector.shift >= CUSUM_MIN_DROP:
+        kpa_drop_alarm(f"CUSUM ref:{detector.mean:.1f} sd:{detector.sd:.1f} {zone=}", -detector.shift)
+    elif step != 0 and DEBUGLVL > 0:         # a rise, or a drop too small to act on
+        lstr = f"{now_time_long()} CUSUM kPa shift: {detector.shift:.1f} at {kpa} ref {detector.mean:.1f} sd {detector.sd:.1f} {zone=}"
+        print(lstr)
+        ev_log.write(lstr + '\n')
+
 def checkForAnomalies()->None:
-    global borepump, tank_is, average_kpa, stdev_Depth, stdev_Press, drop_hiwat
+    global borepump, tank_is, average_kpa, stdev_Depth, stdev_Press
 
     try:
         if borepump.state:                          # pump is ON
             if kpa_sensor_found:        # only check for kPa stuff if we have kPa readings...
                 if avg_kpa_set and read_count_since_ON > (LOOKBACKCOUNT + HI_FREQ_AVG_COUNT):   # == HI_FREQ_RINGSIZE - 1: # this ensures we get a valid average kPa reading
-
-        # NOTE: calc_average_HFpressure behaves differently to other stats methods lin_reg and mean_stddev
-                    av_p_prior  = calc_average_HFpressure(LOOKBACKCOUNT, HI_FREQ_AVG_COUNT) # get average of readings LOOKBACK seconds ago.
-                    av_p_now    = calc_average_HFpressure(0, HI_FREQ_AVG_COUNT)             # zero offset == immediately prior values
-                    actual_pressure_drop = round(av_p_prior - av_p_now, 2)     # Important!  Avoid rounding errors.. avg drop of 0.3 on HT triggered alarm without int()!
-                    # if isRapidDrop(LOOKBACKCOUNT, expected_drop):   # check for rapid drop... if so, then set alarm and turn off pump
-        # NOTE: the startidx param is CRITICAL!!  we need to do LR on the data BEFORE pressure dropped... and NOT include the last 7 seconds
-                    idx =  (hi_freq_kpa_index - 1 - (LOOKBACKCOUNT - P_STD_DEV_COUNT) - HFPAD) % HI_FREQ_RINGSIZE   # Padding added to NOT use last 10 secs in calulcation of slope
-                    k_slope, _, _, prior_stdev_Press, r2 = linear_regression(hf_xvalues, hi_freq_kpa_ring, P_STD_DEV_COUNT, idx, HI_FREQ_RINGSIZE, True)
-                    slope_drop = round(abs(min(k_slope, 0)) * LOOKBACKCOUNT, 2)     # changed from incorrect P_STD_DEV_COUNT 19/7/25
-                    SD_drop    = round(prior_stdev_Press * kPa_sd_multiple, 1)
-                    max_drop   = slope_drop + SD_drop
-                    if actual_pressure_drop > drop_hiwat:
-                        drop_hiwat = actual_pressure_drop
-                    if actual_pressure_drop > max_drop and op_mode != OP_MODE_DISABLED:         # replaced zone=specific const with calculated value from linreg
-                        if not timer_mgr.is_pending(KPA_DROP_TIMER_NAME):
-                            runtime = time.time() - last_ON_time
-                            _, H, M, S = secs_to_DHMS(runtime)
-                            run_str = f'{H}:{M:02}:{S:02}'
-                            # raiseAlarm(f"Pressure DROP after {runmins}:{runseconds:02}. Expected:{expected_drop}", actual_pressure_drop)
-                            raiseAlarm(f"kPa DROP {run_str} after ON  Exceeds max drop:{max_drop:.1f} {k_slope=:.4f} {r2=:.3f} {slope_drop=:.1f} {SD_drop=:.1f} {zone=}", actual_pressure_drop)
-                            error_ring.add(TankError.PRESSUREDROP)
-                            beeper.value(1)                              # this might change... to ONLY if not in TWM/IRRIGATE    
-                            # kpa_drop_timer = Timer(period=ALARMTIME * 1000, mode=Timer.ONE_SHOT, callback=kpadrop_cb)
-                            timer_mgr.create_timer(KPA_DROP_TIMER_NAME, ALARMTIME * 1000, kpadrop_cb)
+                # kPa DROP is now checked on every sample... see check_kpa_drop, called from read_pressure
                 # now get the CURRENT stdev_Press... which will go higher on kpadrop, but for alarm purposes, only interested in residual SD
                 # HI_VAR_PRESS and BELOW_ZONE_MIN still get triggered for next 10 seconds !!  Need to shut up after kPa drop activated
-                    _,_, _, stdev_Press, _ = linear_regression(hf_xvalues, hi_freq_kpa_ring, P_STD_DEV_COUNT, hi_freq_kpa_index, HI_FREQ_RINGSIZE, True)
+                    _,_, _, stdev_Press, _ = kpa_lr_now.result()       # sliding... O(1), kept up to date by read_pressure
                     if not timer_mgr.is_pending(KPA_DROP_TIMER_NAME):
                         if stdev_Press > PRESS_SD_MAX:      # now ignores trend...
                             raiseAlarm("XS P SDEV", stdev_Press)
@@ -2844,8 +2955,9 @@ def checkForAnomalies()->None:
 
                 # changed to get SD of residuals after removing trend... which is significant on normal depth change during tank fill
                 if rec_num > DEPTHRINGSIZE:
-                    make_dr_lists()         # pull (x, y) coordinates.  Should now work no matter time distribution of ring_buffer entries
-                    _,_,_, stdev_Depth, r2 = linear_regression(dr_xvalues, dr_yvalues, DEPTHRINGSIZE, depth_ring.index, DEPTHRINGSIZE, False)
+                    npoints = make_dr_lists()         # pull (x, y) coordinates.  Should now work no matter time distribution of ring_buffer entries
+                    if npoints > 1:         # lists are newest first from 0... fit only the points actually filled
+                        _, _, stdev_Depth = theil_sen(dr_xvalues, dr_yvalues, npoints, npoints, DEPTHRINGSIZE, False)  # robust... one sensor glitch doesn't skew the trend, or the SD
                     if stdev_Depth > DEPTH_SD_MAX:
                         raiseAlarm("XS D SDEV", stdev_Depth)
                         error_ring.add(TankError.HI_VAR_DIST)
@@ -2893,7 +3005,7 @@ def check_for_critical_states() -> None:
 
 # This test needs to be done more frequently... after calculating high frequency kpa
         if kpa_sensor_found:        # if we have a pressure sensor, check for critical values
-            fast_average = calc_average_HFpressure(0, FAST_AVG_COUNT)
+            fast_average = calc_average_HFpressure(0, FAST_AVG_COUNT)     # plain SMA... the safety check keeps its settling time
             if fast_average > 0:         # if we have a valid average kPa reading... but MUST be delayed until we have a few readings
                 if fast_average > config_dict[MAXPRESSURE]:
                     raiseAlarm("XS kPa", fast_average)
@@ -2948,27 +3060,15 @@ def DisplayInfo()->None:
         if   info_display_mode == INFO_AUTO:
             e_code = "   "
             rep_count = 0
-            if error_ring.index > -1:
-                entry  = error_ring.buffer[error_ring.index]
-                tmp = entry[1]              # entry is either an int, or a string consisting of an int followed by a repeat count
-                if type(tmp) == str:
-                    if len(tmp) > 0:
-                        er_str = tmp.split(" ")
-                        # print(f'{er_str=}')             # should look like [code_str, repeat_string_str]
-                        enum_str = er_str[0]
-                        # print(f'{enum_str=}')
-                        rep_count_str = er_str[2]       # looks like 'x3)' ... slice off 1st and last chars to get count, convert to int 
-                        rep_count = int(rep_count_str[1:-1])
-                        tmp = int(enum_str)
-                    # tmp = int(tmp.split(" ")[0])
-                else:
-                    tmp=int(tmp)
-                e_code = errors.get_code(tmp)
+            entry = error_ring.latest()         # (ts, code, repeat count)... no string parsing
+            if entry is not None:
+                e_code = errors.get_code(entry[1])
+                rep_count = entry[2]
             lcd4x20.move_to(0, 0)                # move to top left corner of LCD
             lcd4x20.putstr(f'EC:{e_code:<4}')
 
             lcd4x20.move_to(7, 0)
-            rstr = f'x{rep_count:<2}' if rep_count > 0 else "   "
+            rstr = f'x{rep_count:<2}' if rep_count > 1 else "   "
             lcd4x20.putstr(rstr)
 
             lcd4x20.move_to(11, 0)
@@ -2985,8 +3085,7 @@ def DisplayInfo()->None:
             lcd4x20.putstr(f'D {housetank.depth/1000:<.2f} R{housetank.depth_ROC:>4} SD {stdev_Depth:>4.1f}')
 
             lcd4x20.move_to(0, 3)
-            prev_index = (hi_freq_kpa_index - 1) % HI_FREQ_RINGSIZE
-            lcd4x20.putstr(f'ZP {zone_pressure_dict[zone][1]:>3} Av:{average_kpa:>3.0f} IP:{hi_freq_kpa_ring[prev_index]:>3.0f}')
+            lcd4x20.putstr(f'ZP {zone_pressure_dict[zone][1]:>3} Av:{average_kpa:>3.0f} IP:{hi_freq_kpa_ring.at_offset(0):>3.0f}')
         
         elif info_display_mode == INFO_IRRIG:
         # elif op_mode == OP_MODE_IRRIGATE:
@@ -3049,7 +3148,7 @@ def DisplayInfo()->None:
             lcd4x20.putstr(f'R#:{rec_num:>6} C#:{read_count_since_ON:>6}')
 
             lcd4x20.move_to(0, 3)
-            lcd4x20.putstr(f'Z:{zone:>4} HI:{kpa_peak:3} LO:{kpa_low:3}')       
+            lcd4x20.putstr(f'Z:{zone:>4} HI:{kpa_minmax.max(DIAG_KPA_WINDOW) or 0:3} LO:{kpa_minmax.min(DIAG_KPA_WINDOW) or 0:3}')       # last DIAG_KPA_WINDOW secs
 
         elif info_display_mode == INFO_MAINT:       # MAINTENANCE mode
             lcd4x20.move_to(0, 0)
@@ -3177,9 +3276,8 @@ def DisplayGraph(showhist:bool):
         # display.fill_rect(0, HEIGHT-1, WIDTH-1, HEIGHT-1, 0)
 
         if showhist:
-            for i in range(len(hi_freq_kpa_ring)):
-                mod_index = (hi_freq_kpa_index - DEPTHGRAPHSIZE + i) % HI_FREQ_RINGSIZE
-                p = max(hi_freq_kpa_ring[mod_index], zone_min_kpa)      # ensure no negatives in scaled_dist
+            for kpa in hi_freq_kpa_ring.window(DEPTHGRAPHSIZE):         # a screen's worth, oldest first
+                p = max(kpa, zone_min_kpa)      # ensure no negatives in scaled_dist
                 scaled_dist  = int(HEIGHT * (p - zone_min_kpa) / (zone_max_kpa - zone_min_kpa))
                 display.fill(0)
                 display.updateGraph2D(graphdst, scaled_dist)
@@ -3197,7 +3295,6 @@ def LogTankData()->None:
     global last_logged_kpa
 
 # Now, do the print and logging
-    tempstr = f"{temp:.2f} C"  
     logstr  = now_time_long() + f" {housetank.depth/1000:.3f} {average_kpa:4}\n"    # TODO refactor... LogTankData does MORE than log.. it updates key string vars
     dbgstr  = now_time_short() + f" {housetank.depth/1000:.3f}m {average_kpa:4}kPa"    
 
@@ -3273,8 +3370,10 @@ def init_clock()->bool:
     return True
 
 def init_ringbuffers():
-    global hi_freq_kpa_ring, hi_freq_kpa_index
+    global hi_freq_kpa_ring, kpa_lr_now, kpa_lr_prior, kpa_filter, depth_filter, kpa_minmax
+    global kpa_medium, kpa_slow, kpa_osc
     global event_ring, error_ring, switch_ring, kpa_ring, depth_ring, pp_ring
+    global kpa_archive, depth_archive
     # global depthringbuf, depthringindex     # revert to old style for linreg/residual analysis of SD
     global depth_ROC_ring, depth_ROC_index
 
@@ -3291,17 +3390,37 @@ def init_ringbuffers():
         logger=ev_log.write
     )
 
-    kpa_ring = RingBuffer(
+    kpa_ring = NumericRingBuffer(
         size=KPARINGSIZE, 
         time_formatter=lambda t: format_secs_long(t),
         short_time_formatter=lambda t: format_secs_short(t)
     )
 
-    depth_ring = RingBuffer(
+    depth_ring = NumericRingBuffer(             # array-backed... no tuple per sample
         size=DEPTHRINGSIZE, 
         time_formatter=lambda t: format_secs_long(t),
+        short_time_formatter=lambda t: format_secs_short(t),
+        typecode='h',                           # depth CAN go negative if sensor reads past tank bottom
+        aggregate=True                          # running sum... mean() is O(1) in updateData
+    )
+
+    kpa_archive = RoundRobinArchive(            # long history... History menu reads it, see show_archive
+        minute_size=RRD_MINUTES,
+        hour_size=RRD_HOURS,
+        raw_period=int(PRESSURE_PERIOD_MS / 1000),
+        time_formatter=lambda t: format_secs_long(t),
+        short_time_formatter=lambda t: format_secs_short(t)
+    )
+
+    depth_archive = RoundRobinArchive(
+        minute_size=RRD_MINUTES,
+        hour_size=RRD_HOURS,
+        typecode='h',
+        raw_period=MYDELAY,
+        time_formatter=lambda t: format_secs_long(t),
         short_time_formatter=lambda t: format_secs_short(t)
     )
+    ev_log.write(f"{now_time_long()} RRD footprint kPa:{kpa_archive.footprint()} depth:{depth_archive.footprint()} bytes\n")
 
     pp_ring = RingBuffer(
         size=PPRINGSIZE, 
@@ -3328,12 +3447,55 @@ def init_ringbuffers():
     )
 
     # for now, this one is different...
-    hi_freq_kpa_ring = [0 for _ in range(HI_FREQ_RINGSIZE)]
-    hi_freq_kpa_index = 0
+    hi_freq_kpa_ring = SampleRing(HI_FREQ_RINGSIZE)     # array('H')... owns its write index
+    kpa_lr_now       = SlidingRegression(P_STD_DEV_COUNT)  # latest P_STD_DEV_COUNT samples... gives stdev_Press
+    kpa_lr_prior     = SlidingRegression(P_STD_DEV_COUNT)  # same, but ending KPA_PRIOR_LAG samples ago... trend before any drop
+    kpa_filter       = MedianFilter(KPA_FILTER_LEN, min_dev=KPA_SPIKE_MIN)        # raw kPa goes through this first
+    depth_filter     = MedianFilter(DEPTH_FILTER_LEN, min_dev=PP_SWITCH_NOISE)    # and raw depth
+    kpa_minmax       = SlidingMinMax((ZONE_AVG_COUNT, DIAG_KPA_WINDOW))           # windowed kPa extremes, no ring rescans
+    kpa_medium       = EWMA(shift_for_window(HI_FREQ_AVG_COUNT))    # integer kPa smoothers for logging and average_kpa... as smooth
+    kpa_slow         = EWMA(shift_for_window(AVG_KPA_COUNT))        # as the old windowed averages, but O(1).  Not for safety checks, they settle slower
+    kpa_osc          = GoertzelBank(OSC_WINDOW, [OSC_WINDOW // p for p in OSC_PERIODS], OSC_DIFF_CLIP)    # sliding DFT bins over hi_freq_kpa_ring differences
 
     depth_ROC_ring = [0 for _ in range(DEPTHGRAPHSIZE)]     # change .. plot depth ROC, not actual depth
     depth_ROC_index = 0
 
+def snapshot_rings()->list:
+    """Rings saved in snapshots.  Order matters... save and restore must agree"""
+    return [event_ring, error_ring, switch_ring, pp_ring, depth_ring, kpa_ring, hi_freq_kpa_ring]
+
+def save_snapshot()->None:
+    try:
+        t0 = ticks_ms()
+        nbytes = snapshot.save(SNAPSHOT_FILE, snapshot_rings(), [(depth_ROC_ring, depth_ROC_index)])
+        if DEBUGLVL > 0: print(f"Snapshot: {nbytes} bytes in {ticks_diff(ticks_ms(), t0)} ms")
+    except Exception as e:                  # never let a snapshot take down the caller... regular_snapshot, or shutdown before the ring dumps
+        ev_log.write(f"{now_time_long()} save_snapshot failed: {e}\n")
+
+def restore_snapshot()->None:
+    """Refill freshly initialised rings from a recent snapshot, so detection isn't blind after a restart"""
+    global depth_ROC_index
+
+    try:
+        indexes = snapshot.load(SNAPSHOT_FILE, snapshot_rings(), [(depth_ROC_ring, depth_ROC_index)], SNAPSHOT_MAX_AGE)
+        if indexes is None:
+            ev_log.write(f"{now_time_long()} No recent snapshot... rings start empty\n")
+            return
+        depth_ROC_index = indexes[0]
+        hf = hi_freq_kpa_ring                   # prime the sliding regressions from the restored samples, oldest first
+        for k in range(min(P_STD_DEV_COUNT, len(hf)) - 1, -1, -1):
+            kpa_lr_now.add(hf.at_offset(k))
+        for k in range(min(P_STD_DEV_COUNT, len(hf) - KPA_PRIOR_LAG) - 1, -1, -1):
+            kpa_lr_prior.add(hf.at_offset(KPA_PRIOR_LAG + k))
+        ev_log.write(f"{now_time_long()} Restored snapshot: {len(event_ring)} events, {len(error_ring)} errors, {len(depth_ring)} depths\n")
+    except Exception as e:
+        ev_log.write(f"{now_time_long()} restore_snapshot failed: {e}\n")
+
+async def regular_snapshot(period_secs)->None:
+    while True:
+        await asyncio.sleep(period_secs)
+        save_snapshot()
+
 def change_TB(newTB_ms):
     if distSensor is not None:
         distSensor.stopRanging()
@@ -3404,13 +3566,14 @@ def init_all():
     presspump           = Pump("PressurePump", False)
 
     init_ringbuffers()                      # this is required BEFORE we raise any alarms...
+    restore_snapshot()                      # ... and this before anything gets added
 
-    navigator.set_buffer(MenuNavigator.EVENTRING,  event_ring.buffer)
-    navigator.set_buffer(MenuNavigator.SWITCHRING, switch_ring.buffer)
-    navigator.set_buffer(MenuNavigator.KPARING,    kpa_ring.buffer)
-    navigator.set_buffer(MenuNavigator.ERRORRING,  error_ring.buffer)
-    navigator.set_buffer(MenuNavigator.DEPTHRING,  depth_ring.buffer)
-    navigator.set_buffer(MenuNavigator.PPRING,     pp_ring.buffer)
+    navigator.set_buffer(MenuNavigator.EVENTRING,  event_ring)
+    navigator.set_buffer(MenuNavigator.SWITCHRING, switch_ring)
+    navigator.set_buffer(MenuNavigator.KPARING,    kpa_ring)
+    navigator.set_buffer(MenuNavigator.ERRORRING,  error_ring)
+    navigator.set_buffer(MenuNavigator.DEPTHRING,  depth_ring)
+    navigator.set_buffer(MenuNavigator.PPRING,     pp_ring)
 
     navigator.set_program_list(program_list)
     #  Note: filelist is set in show_dir... DO NOT set here !!
@@ -3636,24 +3799,43 @@ async def read_pressure()->None:
 
     Also, rapid check for excess pressure... if so, turn off pump and solenoid.
     """
-    global hi_freq_kpa_ring, hi_freq_kpa_index, kpa_peak, time_peak, kpa_low, stable_pressure
-    global read_count_since_ON
+    global kpa_peak, time_peak, kpa_low, stable_pressure
+    global read_count_since_ON, xs_raw_count
 
     try:
         while True:
             # if SIMULATE_KPA:
             #     bpp = random.randint(100, 600)
             # else:
-            raw_val, bpp = get_pressure()
-            # print(f"Press: {bpp:>3} kPa, {hi_freq_kpa_index=}")
-            if bpp > kpa_peak:
-                kpa_peak = bpp       # record peak value.  Will be reset on borepump_ON, and fixed in set_zone
+            raw_val, raw_kpa = get_pressure()
+            bpp, spike = kpa_filter.filter(raw_kpa)     # a one-off spike is replaced by the window median... before the rings and the drop/CUSUM checks see it.
+                                                        # A genuine step is held back too, until it is most of the window: KPA_FILTER_LEN // 2 + 1 reads, 3 s at 1 Hz
+            if spike and DEBUGLVL > 1:
+                print(f"kPa spike: {raw_kpa} replaced by median {bpp} ({kpa_filter.outliers} so far)")
+            # print(f"Press: {bpp:>3} kPa, {hi_freq_kpa_ring.index=}")
+            if raw_kpa > kpa_peak:
+                kpa_peak = raw_kpa   # record peak value.  Will be reset on borepump_ON, and fixed in set_zone.  Raw: a start-up overshoot is short, the filter would hide it
                 time_peak = time.time()
-            if borepump.state and stable_pressure and bpp < kpa_low:    # only cache lows if pump is ON...
-                kpa_low = bpp
-            hi_freq_kpa_ring[hi_freq_kpa_index] = bpp
-            hi_freq_kpa_index = (hi_freq_kpa_index + 1) % HI_FREQ_RINGSIZE
-            hi_freq_avg = calc_average_HFpressure(0, HI_FREQ_AVG_COUNT)           # short average count... last few readings
+            if borepump.state and stable_pressure and raw_kpa < kpa_low:    # only cache lows if pump is ON...
+                kpa_low = raw_kpa
+            if borepump.state and stable_pressure and zone in zone_kpa_quantiles:
+                for est in zone_kpa_quantiles[zone]:
+                    est.add(bpp)
+            hi_freq_kpa_ring.add(bpp)
+            kpa_minmax.add(bpp)
+            kpa_medium.add(bpp)
+            kpa_slow.add(bpp)
+            kpa_osc.add(bpp - hi_freq_kpa_ring.at_offset(1),           # differences... newest, and the one leaving its window
+                        hi_freq_kpa_ring.at_offset(OSC_WINDOW) - hi_freq_kpa_ring.at_offset(OSC_WINDOW + 1))
+            kpa_lr_now.add(bpp)
+            if len(hi_freq_kpa_ring) > KPA_PRIOR_LAG:
+                kpa_lr_prior.add(hi_freq_kpa_ring.at_offset(KPA_PRIOR_LAG))
+            kpa_archive.add(bpp)                # rolls up into 1-min and hourly tiers
+            hi_freq_avg = calc_average_HFpressure(0, HI_FREQ_AVG_COUNT)       # short average count... last few readings
+            if raw_kpa > config_dict[MAXPRESSURE]:
+                xs_raw_count += 1               # unfiltered... a real overpressure shouldn't wait for the median to give way
+            else:
+                xs_raw_count = 0
             read_count_since_ON += 1
             if read_count_since_ON > STABLE_KPA_COUNT: 
                 stable_pressure = True                  # need to reset in pump_ON
@@ -3666,7 +3848,8 @@ async def read_pressure()->None:
                 # This gets switched On/OFF depending on pump state... but NOTE: buffer updates happen ALWAYS!
                 # error_bar = bpp - round(stdev_Press * float(config_dict[KPASTDEVMULT] / 10 ), 2)
                 error_bar = bpp - stdev_Press * kPa_sd_multiple   # make consistent with calc max_drop in checkforanomalies
-                hf_log.write(f"{now_time_long()} {bpp:>3} {hi_freq_avg:.1f} {error_bar:.1f}\n")
+                hf_log.write(hf_fmt.reset().put_now_long().put_byte(32).put_int(bpp, 3).put_byte(32)
+                             .put_fixed(kpa_medium.scaled(10), 1).put_byte(32).put_fixed(round(error_bar * 10), 1).end())
             if ui_mode == UI_MODE_NORM:
                 if op_mode ==  OP_MODE_AUTO: 
                     if display_mode == DM_PRESSURE and navigator.mode == MenuNavigator.NAVMODE_MENU:
@@ -3674,8 +3857,12 @@ async def read_pressure()->None:
                         lcd.setCursor(9, 1)
                         lcd.printout(lstr)
 
-            if hi_freq_avg > float(config_dict[MAXPRESSURE]):
-                raiseAlarm("XS H/F kPa", hi_freq_avg)
+            check_kpa_drop()                    # every sample, not just every DELAY secs
+            check_kpa_cusum(bpp)
+            check_kpa_oscillation()
+
+            if hi_freq_avg > float(config_dict[MAXPRESSURE]) or xs_raw_count >= FAST_AVG_COUNT:
+                raiseAlarm("XS H/F kPa", max(hi_freq_avg, raw_kpa))
                 error_ring.add(TankError.EXCESS_KPA)                        
                 abort_pumping("Max kPa exceeded")       # this is safer
                 confirm_and_switch_solenoid(False)      # TODO Problem !! Turning solenoid off needs to aysnc confirm pump is OFF so... also needs to be async.
@@ -3840,7 +4027,7 @@ async def monitor_pressure_pump(sleep_ms:int)->None:
             presspump.switch_pump(pp_status)
             pp_str = 'ON' if pp_status else 'OFF'
             pp_ring.add(pp_str)
-            if LOGPPDATA: pp_log.write(f'{now_time_long()} {pp_str}\n')
+            if LOGPPDATA: pp_log.write(pp_fmt.reset().put_now_long().put_byte(32).put_bytes(b'ON' if pp_status else b'OFF').end())
 
             last_pp_status = pp_status
         await asyncio.sleep_ms(sleep_ms)
@@ -3892,7 +4079,7 @@ async def pp_anomaly_check(period_s)->None:
         tupltime = now_time_tuple()
         hour = tupltime[3]
         nightwatch = hour > PP_dict[PP_NIGHT_STRT_STR] or hour < PP_dict[PP_NIGHT_END_STR]      # TODO make these consts config params
-        blen = len(pp_ring.buffer)
+        blen = len(pp_ring)
         if DEBUGLVL > 0: ev_log.write(f'{now_time_long()} pp_anomaly_check {hour=} {nightwatch=} {blen=}\n' )
         if nightwatch:
             if presspump.state:
@@ -3901,9 +4088,9 @@ async def pp_anomaly_check(period_s)->None:
                     ev_log.write(f'{now_time_long()} PP nightwatch continuous running!')
         # now... the tricky bit, may need to tweak parameters in PP_Cycle_detect
             if blen > 8:      # don't run if buffer is (almost) empty
-                result = detect_pump_cycling(pp_ring.buffer,
-                                             (pp_ring.index - 1) % PPRINGSIZE,  # why - 1? Claude code asssumes HEAD is next write point...
-                                             blen,
+                now = time.time()
+                result = detect_pump_cycling(pp_ring.since(now - period_s),    # binary search... only the lookback span, oldest first
+                                             now=now,
                                              min_cycles=PP_dict[PP_NUM_CYCLES],
                                              max_on_s=PP_dict[PP_MAX_ON],
                                              min_off_s=PP_dict[PP_MIN_OFF],
@@ -4222,6 +4409,7 @@ async def main_control_task():
     asyncio.create_task(blinkx2())                              # visual indicator we are running
     # asyncio.create_task(check_lcd_btn())                       # start up lcd_button widget
     asyncio.create_task(regular_flush(FLUSH_PERIOD))            # flush data every FLUSH_PERIOD minutes
+    asyncio.create_task(regular_snapshot(SNAPSHOT_PERIOD))      # binary snapshot of rings, for warm restart
     asyncio.create_task(check_rotary_state(ROTARY_PERIOD_MS))   # check rotary every ROTARY_PERIOD_MS milliseconds
     asyncio.create_task(processemail_queue())                   # check email queue
     asyncio.create_task(monitor_vbus())
@@ -4257,7 +4445,7 @@ async def main_control_task():
 
 # Now the real monitoring loop begins...
 
-    rec_num=0
+    rec_num = len(depth_ring)               # non-zero if restored from snapshot... no need to wait for the ring to refill
     while True:
         updateData()			                    # monitor water depth in tank, also sets tank_is
         if op_mode != OP_MODE_MAINT:
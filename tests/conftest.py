@@ -0,0 +1,14 @@
+# Host tests for the pure-Python parts of lib/... the modules are plain micropython-compatible code, so CPython runs them.
+# bench/ is on the path for the reference implementations the optimised kernels replaced.
+
+import os
+import sys
+import time
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for d in ("lib", "bench"):
+    sys.path.insert(0, os.path.join(_ROOT, d))
+
+if hasattr(time, "tzset"):          # the Pico keeps UTC... utils works out DST boundaries on that basis
+    os.environ["TZ"] = "UTC"
+    time.tzset()
@@ -0,0 +1,50 @@
+# Cusum kPa drop detector: quiet on noise and slow drift, quick on a step, shift estimate near the step
+
+import random
+
+from stats import Cusum
+
+K, H, LEARN = 1.0, 6.0, 60          # as MainTX: CUSUM_K, CUSUM_H, CUSUM_LEARN
+TRACK       = 1 / 128               # CUSUM_TRACK
+MIN_DROP    = 8                     # CUSUM_MIN_DROP, kPa
+
+def drops(rng, secs, drift_per_hour=0.0, step=0, step_at=None, track=TRACK):
+    """One pump run at 1 Hz, 1.5 kPa noise: (sample, estimated shift) for each drop signal big enough to act on"""
+    c = Cusum(K, H, LEARN, track=track)
+    out = []
+    for t in range(secs):
+        level = 400 - drift_per_hour * t / 3600
+        if step_at is not None and t >= step_at:
+            level -= step
+        if c.add(round(level + rng.gauss(0, 1.5))) < 0 and -c.shift >= MIN_DROP:
+            out.append((t, c.shift))
+    return out
+
+def test_drift_is_followed():
+    rng = random.Random(20)
+    for drift in (0, 3, 10):                        # kPa per hour
+        alarms = sum(1 for _ in range(20) if drops(rng, 3600, drift))
+        assert alarms == 0, drift
+
+def test_frozen_reference_alarms_on_drift():
+    """What track is for... held where learning left it, 10 kPa/hour walks out past the floor"""
+    rng = random.Random(20)
+    assert all(drops(rng, 3600, 10, track=0) for _ in range(5))
+
+def test_step_drop():
+    rng = random.Random(20)
+    for step, worst in ((10, 5), (30, 1)):
+        for _ in range(20):
+            found = drops(rng, 400, step=step, step_at=200)
+            assert found and found[0][0] - 200 <= worst, (step, found[:1])
+
+def test_learning_is_silent():
+    c = Cusum(K, H, LEARN)
+    assert all(c.add(0 if i < LEARN // 2 else 500) == 0 for i in range(LEARN))
+    assert c.learning() is False
+
+def test_rise():
+    c = Cusum(K, H, 10)
+    for i in range(10):
+        c.add(400 + i % 3)
+    assert c.add(430) == 1 and c.shift > 0
@@ -0,0 +1,49 @@
+# Integer EWMA: window mapping, level tracking, warm-up after reset, fixed-point outputs
+
+import random
+
+from filters import EWMA, shift_for_window
+
+WINDOWS = (3, 7, 30)                # FAST_AVG_COUNT, HI_FREQ_AVG_COUNT, AVG_KPA_COUNT
+
+def test_shift_for_window():
+    assert [shift_for_window(n) for n in WINDOWS] == [1, 2, 4]
+    for n in range(1, 200):
+        shift = shift_for_window(n)
+        assert (2 << shift) - 1 >= n
+        assert shift == 0 or (1 << shift) - 1 < n          # and no smoother than it needs to be
+
+def test_tracks_level():
+    rng = random.Random(19)
+    for n in WINDOWS:
+        e = EWMA(shift_for_window(n))
+        xs = [400 + int(rng.gauss(0, 8)) for _ in range(5000)]
+        for x in xs:
+            e.add(x)
+        assert abs(e.value() - sum(xs) / len(xs)) < 8
+
+def test_warm_up_is_running_mean():
+    e = EWMA(4)
+    for x in (300, 310, 320):
+        e.add(x)
+    assert e.int_value() == 310                         # not dragged towards the 0 it was reset to
+    e.reset()
+    assert e.value() == 0 and e.count == 0
+    e.add(500)
+    assert e.int_value() == 500
+
+def test_step_settles():
+    for stages in (1, 2):
+        e = EWMA(2, stages)
+        for _ in range(8):
+            e.add(0)
+        for _ in range(100):
+            e.add(400)
+        assert e.int_value() == 400
+
+def test_scaled():
+    e = EWMA(1)
+    e.add(352)
+    e.add(353)
+    assert e.scaled(10) == 3525
+    assert e.int_value() == 353                         # rounds half up
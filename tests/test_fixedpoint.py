@@ -0,0 +1,48 @@
+# fixed_point=True (integer sums) against the float path, on integer kPa/mm data as the Pico sees it
+
+import random
+from array import array
+from fractions import Fraction
+
+import pytest
+
+import stats
+from stats import mean_stddev, ring_mean
+
+RINGLEN = 1024
+
+@pytest.fixture(autouse=True)
+def loop_path(monkeypatch):
+    """Float loop vs integer loop... the vector path is tested in test_vector.py"""
+    monkeypatch.setattr(stats, "VECTOR_MIN_STDDEV", 1 << 30)
+
+def rings(rng):
+    y = [rng.randint(0, 700) for _ in range(RINGLEN)]
+    x = [5 * i + rng.randint(0, 3) for i in range(RINGLEN)]
+    return x, y, rng.choice((2, 3, 12, 60, 128, 512)), rng.randrange(RINGLEN)
+
+def test_mean_stddev_bounds():
+    rng = random.Random(13)
+    for _ in range(400):
+        x, y, n, start = rings(rng)
+        m_f, sd_f = mean_stddev(y, n, start, RINGLEN)
+        m_i, sd_i = mean_stddev(y, n, start, RINGLEN, fixed_point=True)
+        assert m_i == pytest.approx(m_f, rel=1e-12, abs=1e-12)
+        assert sd_i == pytest.approx(sd_f, rel=1e-9, abs=1e-9)
+        tup = [(x[i], y[i]) for i in range(RINGLEN)]
+        assert mean_stddev(tup, n, start, RINGLEN, fixed_point=True) == (m_i, sd_i)
+
+def test_fixed_point_flat():
+    flat = [300] * RINGLEN
+    assert mean_stddev(flat, 60, 10, RINGLEN, fixed_point=True) == (300, 0)
+
+def test_ring_mean_exact(monkeypatch):
+    monkeypatch.setattr(stats, "VECTOR_MIN_MEAN", 0)         # fixed_point must stay off the vector path even so
+    monkeypatch.setattr(stats, "_ring_vector", None)
+    rng = random.Random(13)
+    kpa = array('H', [rng.randint(0, 700) for _ in range(RINGLEN)])    # as hi_freq_kpa_ring.samples
+    for _ in range(400):
+        n = rng.choice((1, 3, 7, 30, 512, RINGLEN))
+        start = rng.randrange(RINGLEN)
+        vals = [kpa[(start - 1 - i) % RINGLEN] for i in range(n)]
+        assert ring_mean(kpa, n, start, RINGLEN, fixed_point=True) == float(Fraction(sum(vals), n)), (n, start)
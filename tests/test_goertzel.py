@@ -0,0 +1,60 @@
+# GoertzelBank as check_kpa_oscillation runs it: sines found at their amplitude, steps and ramps not mistaken for them
+
+import math
+import random
+
+import pytest
+
+from stats import GoertzelBank
+
+OSC_WINDOW    = 64                  # as MainTX
+OSC_PERIODS   = (4, 8, 16)
+OSC_KPA_AMPL  = 4
+OSC_PERSIST   = 5
+OSC_DIFF_CLIP = 2 * OSC_KPA_AMPL
+
+def longest_run(signal, secs=400, seed=22):
+    """Most consecutive samples with the peak bin over OSC_KPA_AMPL, fed differences as read_pressure does"""
+    rng = random.Random(seed)
+    bank = GoertzelBank(OSC_WINDOW, [OSC_WINDOW // p for p in OSC_PERIODS], OSC_DIFF_CLIP)
+    ring = []
+    run = best = 0
+    for t in range(secs):
+        ring.append(round(signal(t) + rng.gauss(0, 1.5)))
+        new = ring[-1] - ring[-2] if len(ring) > 1 else 0
+        old = ring[-1 - OSC_WINDOW] - ring[-2 - OSC_WINDOW] if len(ring) > OSC_WINDOW + 1 else 0
+        bank.add(new, old)
+        run = run + 1 if bank.peak()[1] > OSC_KPA_AMPL else 0
+        best = max(best, run)
+    return best
+
+@pytest.mark.parametrize("step", (30, 50, 100))
+def test_step_is_not_oscillation(step):
+    assert longest_run(lambda t: 400 - (step if t >= 200 else 0)) < OSC_PERSIST
+
+@pytest.mark.parametrize("drop, over", ((50, 3), (80, 5), (150, 8), (150, 12)))
+def test_fast_ramp_is_not_oscillation(drop, over):
+    assert longest_run(lambda t: 400 - drop * min(max(t - 200, 0), over) / over) < OSC_PERSIST
+
+def test_noise_and_drift():
+    assert longest_run(lambda t: 400) == 0
+    assert longest_run(lambda t: 400 - 0.05 * t) == 0
+
+@pytest.mark.parametrize("period", OSC_PERIODS)
+def test_sine_found(period):
+    assert longest_run(lambda t: 400 + 5 * math.sin(2 * math.pi * t / period)) > 300
+    assert longest_run(lambda t: 400 + 3 * math.sin(2 * math.pi * t / period)) == 0
+
+def test_amplitude_scaled_back():
+    """Unclipped differences read the same amplitude as the samples themselves"""
+    for period in OSC_PERIODS:
+        xs = [400 + 6 * math.sin(2 * math.pi * t / period) for t in range(OSC_WINDOW * 3)]
+        ds = [0] + [xs[t] - xs[t - 1] for t in range(1, len(xs))]
+        bank = GoertzelBank(OSC_WINDOW, [OSC_WINDOW // p for p in OSC_PERIODS], 100)
+        plain = GoertzelBank(OSC_WINDOW, [OSC_WINDOW // p for p in OSC_PERIODS])
+        for t in range(len(xs)):
+            bank.add(ds[t], ds[t - OSC_WINDOW] if t >= OSC_WINDOW else 0)
+            plain.add(xs[t], xs[t - OSC_WINDOW] if t >= OSC_WINDOW else 0)
+        i, ampl = bank.peak()
+        assert OSC_PERIODS[i] == period and ampl == pytest.approx(6, rel=1e-6)
+        assert plain.peak() == pytest.approx((i, 6), rel=1e-6)
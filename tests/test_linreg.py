@@ -0,0 +1,41 @@
+# linear_regression (one pass) against the three-pass version it replaced
+
+import random
+
+import pytest
+
+from stats import linear_regression
+from reference import linear_regression_ref
+
+RINGLEN = 1024
+
+def make_ring(rng, kind):
+    if kind == "kpa":                                           # 1 Hz kPa, noisy with a slow trend
+        return [int(350 - i * 0.05 + rng.gauss(0, 4)) for i in range(RINGLEN)]
+    return [1000 + int(i * 0.7) + rng.randint(-3, 3) for i in range(RINGLEN)]      # depth, mm
+
+@pytest.mark.parametrize("dummy", (True, False))
+@pytest.mark.parametrize("kind", ("kpa", "depth"))
+def test_matches_reference(kind, dummy):
+    rng = random.Random(12)
+    for _ in range(150):
+        y = make_ring(rng, kind)
+        x = [5 * i + rng.randint(0, 2) for i in range(RINGLEN)]       # uneven secs, offset as make_dr_lists does
+        count = rng.choice((2, 3, 12, 60, 128, 512))
+        start = rng.randrange(RINGLEN)                                  # start anywhere... exercises the wrap
+        ref = linear_regression_ref(x, y, count, start, RINGLEN, dummy)
+        new = linear_regression(x, y, count, start, RINGLEN, dummy)
+        for k in (0, 1, 2, 4):
+            assert new[k] == pytest.approx(ref[k], rel=1e-8, abs=1e-8), (count, start)
+        # residual SD is sqrt of a difference... compare the variances, scaled by the total (perfect fits sit at ~0)
+        assert abs(ref[3] ** 2 - new[3] ** 2) <= 1e-9 * max(1.0, ref[2] ** 2), (count, start)
+
+def test_flat_ring():
+    flat = [300] * RINGLEN                                      # no variance... r2 and SDs all zero, no exceptions
+    assert linear_regression(flat, flat, 60, 10, RINGLEN, True)[2:] == (0, 0, 0)
+
+def test_bad_args():
+    with pytest.raises(ValueError):
+        linear_regression([1, 2, 3], [1, 2, 3], 1, 0, 3, True)
+    with pytest.raises(ValueError):
+        linear_regression([1, 2, 3], [1, 2], 2, 0, 3, True)
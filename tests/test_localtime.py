@@ -0,0 +1,29 @@
+# secs_to_localtime with per-year cached DST boundaries, against the version that rebuilt them every call
+
+import random
+import time
+
+import pytest
+
+from utils import secs_to_localtime
+from reference import secs_to_localtime_ref
+
+def utc(*ymd):
+    return int(time.mktime(ymd + (0, 0, 0, 0, 0, 0)))
+
+def test_random_times():
+    rng = random.Random(23)
+    lo, hi = utc(2024, 1, 1), utc(2031, 1, 1)
+    for _ in range(20000):
+        secs = rng.randrange(lo, hi)
+        assert tuple(secs_to_localtime(secs)) == tuple(secs_to_localtime_ref(secs)), secs
+
+@pytest.mark.parametrize("year", range(2024, 2031))
+def test_changeovers(year):
+    """Either side of each DST changeover, and of new year... and back again, so the cache is refilled both ways"""
+    for month, day in ((4, 1), (4, 7), (10, 1), (10, 7), (1, 1), (12, 31), (4, 1)):
+        base = utc(year, month, day)
+        for k in range(-2, 52):
+            for d in (-1, 0, 1):
+                secs = base + k * 1800 + d
+                assert tuple(secs_to_localtime(secs)) == tuple(secs_to_localtime_ref(secs)), secs
@@ -0,0 +1,46 @@
+# LineFormatter: same text as the f-strings it replaced, and overflow that shows
+
+import random
+
+import pytest
+
+from utils import LineFormatter, now_time_long
+
+def text(line):
+    return bytes(line).decode()
+
+def test_hf_line_matches_fstring():
+    rng = random.Random(25)
+    fmt = LineFormatter(48)
+    for _ in range(5000):
+        bpp = rng.randint(0, 800)
+        avg = rng.randint(0, 8000)                  # tenths
+        err = rng.randint(-500, 8000)
+        want = f"{bpp:>3} {avg / 10:.1f} {err / 10:.1f}\n"
+        got = text(fmt.reset().put_int(bpp, 3).put_byte(32).put_fixed(avg, 1).put_byte(32).put_fixed(err, 1).end())
+        assert got == want
+    assert fmt.overflows == 0
+
+@pytest.mark.parametrize("n, decimals, width", ((0, 0, 0), (7, 3, 0), (-7, 3, 0), (1234, 3, 0), (-1234, 1, 8),
+                                                (5, 2, 6), (-5, 2, 1), (1000000, 0, 3), (-10, 1, 0)))
+def test_put_fixed(n, decimals, width):
+    want = f"{n / 10 ** decimals:{width}.{decimals}f}" if decimals else f"{n:{width}}"
+    assert text(LineFormatter(32).put_fixed(n, decimals, width).end()) == want + "\n"
+
+def test_now_long():
+    fmt = LineFormatter(32)
+    t = now_time_long()
+    assert text(fmt.reset().put_now_long().end())[:-1] in (t, now_time_long())       # may tick between the two
+
+def test_number_overflow_is_marked():
+    fmt = LineFormatter(10)
+    line = text(fmt.reset().put_int(12345, 6).put_fixed(99999, 2).end())
+    assert line == " 12345###\n"                    # the field that didn't fit is '#', not missing
+    assert fmt.overflows == 2                       # and the newline took the last byte
+
+def test_bytes_overflow_counted():
+    fmt = LineFormatter(8)
+    assert text(fmt.reset().put_bytes(b"OFF").put_bytes(b" and more").end()) == "OFF and\n"
+    assert fmt.overflows == 2
+    fmt.reset().put_bytes(b"ON").end()
+    assert fmt.overflows == 2                       # counts since made, not per line
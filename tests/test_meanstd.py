@@ -0,0 +1,72 @@
+# One-pass (Welford) mean_stddev against the two-pass version it replaced
+
+import random
+from array import array
+
+import pytest
+
+import stats
+from stats import mean_stddev, tuple_value
+from ringbuffer import NumericRingBuffer, SampleRing
+from reference import mean_stddev_ref
+
+RINGLEN = 1024
+
+@pytest.fixture(autouse=True)
+def loop_path(monkeypatch):
+    monkeypatch.setattr(stats, "VECTOR_MIN_STDDEV", 1 << 30)   # the vector path is tested in test_vector.py
+
+class Counting:
+    """Wraps a buffer, counting element reads"""
+    def __init__(self, buff):
+        self.buff = buff
+        self.reads = 0
+    def __getitem__(self, i):
+        self.reads += 1
+        return self.buff[i]
+    def __len__(self):
+        return len(self.buff)
+
+def test_matches_reference():
+    rng = random.Random(15)
+    for _ in range(300):
+        vals = [rng.randint(0, 700) for _ in range(RINGLEN)]
+        tups = [(1762484000 + i, v) for i, v in enumerate(vals)]
+        n = rng.choice((2, 3, 12, 60, 128, 1024))
+        start = rng.randrange(RINGLEN)
+        ref = mean_stddev_ref(vals, n, start, RINGLEN)
+        for got in (mean_stddev(vals, n, start, RINGLEN),
+                    mean_stddev(tups, n, start, RINGLEN),                       # tuples spotted automatically
+                    mean_stddev(tups, n, start, RINGLEN, key=tuple_value),
+                    mean_stddev(array('H', vals), n, start, RINGLEN)):          # array column
+            assert got == pytest.approx(ref, rel=1e-9, abs=1e-9), (n, start)
+
+def test_large_offset():
+    """Big offset, tiny spread: the naive Σx² way falls apart, Welford shouldn't"""
+    vals = [1e8 + (i % 3) for i in range(RINGLEN)]
+    _, sd = mean_stddev(vals, 999, RINGLEN, RINGLEN)
+    ref = mean_stddev_ref([v - 1e8 for v in vals], 999, RINGLEN, RINGLEN)
+    assert abs(sd - ref[1]) < 1e-6
+
+def test_ring_columns():
+    """Every ring type in init_ringbuffers... via its column"""
+    depth = NumericRingBuffer(12, typecode='h')
+    hf = SampleRing(1024)
+    for i in range(50):
+        depth.add(1500 - i)
+        hf.add(300 + i % 7)
+    assert mean_stddev(depth.values, 12, depth.index + 1, 12)[0] == sum(depth.window().values()) / 12
+    assert mean_stddev(hf.samples, 50, hf.index, 1024)[0] == pytest.approx(sum(hf.window()) / 50)
+
+def test_one_read_per_element():
+    rng = random.Random(15)
+    vals = [rng.randint(0, 700) for _ in range(RINGLEN)]
+    c = Counting(vals)
+    mean_stddev(c, 100, 0, RINGLEN)
+    c_ref = Counting(vals)
+    mean_stddev_ref(c_ref, 100, 0, RINGLEN)
+    assert c_ref.reads == 200
+    assert c.reads <= 101                   # +1: the peek at buff[0] for tuples
+
+def test_short_windows():
+    assert mean_stddev([5, 6, 7], 1, 1, 3) == (0, 0)
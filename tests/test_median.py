@@ -0,0 +1,44 @@
+# MedianFilter (Hampel): sorted window upkeep, MAD, spike replacement and step acceptance
+
+import random
+
+from stats import MedianFilter
+
+def upper_median(a):
+    return sorted(a)[len(a) >> 1]
+
+def test_window_and_mad():
+    rng = random.Random(16)
+    for n in (1, 2, 5, 8):
+        f = MedianFilter(n)
+        recent = []
+        for _ in range(300):
+            x = rng.randint(295, 305)                   # narrow range... plenty of duplicate values to evict
+            f.add(x)
+            recent = (recent + [x])[-n:]
+            assert f.sorted == sorted(recent)
+            med = upper_median(recent)
+            assert f.median() == med
+            assert f.mad() == upper_median([abs(v - med) for v in recent])
+
+def test_empty():
+    f = MedianFilter(5)
+    assert f.median() is None and f.mad() == 0
+    assert f.filter(300) == (300, False)                # too few to judge... passed through
+
+def test_spike_replaced():
+    f = MedianFilter(5, min_dev=20)
+    for x in (300, 302, 298, 301, 299):
+        assert f.filter(x) == (x, False)
+    assert f.filter(650) == (300, True)
+    assert f.filter(315) == (315, False)                # within min_dev of the median
+    assert f.outliers == 1
+
+def test_step_accepted():
+    for n in (5, 7):
+        f = MedianFilter(n, min_dev=20)
+        for _ in range(n):
+            f.filter(300)
+        out = [f.filter(100) for _ in range(n)]
+        held = n // 2 + 1                               # replaced until the step is most of the window
+        assert out == [(300, True)] * held + [(100, False)] * (n - held)
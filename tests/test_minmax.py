@@ -0,0 +1,35 @@
+# SlidingMinMax: windowed extremes against brute force over the same trailing windows
+
+import random
+
+from stats import SlidingMinMax
+
+WINDOWS = (1, 12, 60)
+
+def test_matches_brute_force():
+    rng = random.Random(17)
+    mm = SlidingMinMax(WINDOWS)
+    seen = []
+    for i in range(500):
+        x = rng.randint(280, 320) if i % 50 else rng.choice((0, 700))      # the odd extreme, then it has to expire
+        if 200 <= i < 260:
+            x = 300                                     # a flat run... ties in the deques
+        mm.add(x)
+        seen.append(x)
+        for w in WINDOWS:
+            recent = seen[-w:]
+            assert (mm.min(w), mm.max(w)) == (min(recent), max(recent)), (i, w)
+            assert mm.spread(w) == max(recent) - min(recent)
+
+def test_empty_and_clear():
+    mm = SlidingMinMax(WINDOWS)
+    for w in WINDOWS:
+        assert mm.max(w) is None and mm.min(w) is None
+        assert mm.spread(w) == 0
+    for x in (300, 350, 250):
+        mm.add(x)
+    assert (mm.min(60), mm.max(60), mm.spread(1)) == (250, 350, 0)
+    mm.clear()
+    assert mm.spread(60) == 0 and mm.max(12) is None
+    mm.add(400)                                         # sequence numbering restarts cleanly
+    assert (mm.min(60), mm.max(60)) == (400, 400)
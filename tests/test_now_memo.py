@@ -0,0 +1,27 @@
+# now_time_short/now_time_long: formatted once per second, and right when the second changes
+
+import time
+
+import utils
+from utils import now_time_short, now_time_long, format_secs_short, format_secs_long
+
+T0 = 1762484000
+
+def test_memo_per_second(monkeypatch):
+    clock = [T0 + 0.2]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    calls = []
+    real = utils.format_time_long
+    monkeypatch.setattr(utils, "format_time_long", lambda t: calls.append(t) or real(t))
+    first = now_time_long()
+    clock[0] = T0 + 0.9
+    assert now_time_long() is first and len(calls) == 1         # same second... the string made last time
+    clock[0] = T0 + 1.0
+    assert now_time_long() == format_secs_long(T0 + 1) != first
+    assert len(calls) == 3                                      # new second, plus the format_secs_long above
+
+def test_short_and_long(monkeypatch):
+    for secs in (T0, T0 + 1, T0 + 86400 * 150):                 # either side of a DST changeover too
+        monkeypatch.setattr(time, "time", lambda: secs + 0.5)
+        assert now_time_long() == format_secs_long(secs)
+        assert now_time_short() == format_secs_short(secs)
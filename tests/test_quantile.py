@@ -0,0 +1,45 @@
+# P2Quantile: streaming estimates against the quantile of the sorted samples
+
+import random
+
+import pytest
+
+from stats import P2Quantile
+
+def rank_of(samples, v):
+    """Fraction of samples at or below v"""
+    return sum(1 for s in samples if s <= v) / len(samples)
+
+@pytest.mark.parametrize("p", (0.1, 0.5, 0.9))
+@pytest.mark.parametrize("kind", ("gauss", "uniform", "skewed"))
+def test_accuracy(p, kind):
+    rng = random.Random(18)
+    for _ in range(5):
+        est = P2Quantile(p)
+        xs = []
+        for _ in range(2000):
+            if kind == "gauss":
+                x = rng.gauss(350, 12)                  # running zone kPa
+            elif kind == "uniform":
+                x = rng.uniform(0, 700)
+            else:
+                x = 300 + rng.expovariate(0.05)
+            est.add(x)
+            xs.append(x)
+        assert rank_of(xs, est.value()) == pytest.approx(p, abs=0.02)
+        xs.sort()
+        assert est.value() == pytest.approx(xs[int(p * (len(xs) - 1))], abs=0.02 * (xs[-1] - xs[0]))
+
+def test_exact_while_few():
+    est = P2Quantile(0.5)
+    assert est.value() is None
+    for x, want in ((310, 310), (290, 310), (300, 300), (280, 300), (320, 300)):
+        est.add(x)
+        assert est.value() == want
+    assert est.heights == [280, 290, 300, 310, 320]     # sorted once the markers are full
+
+def test_ints_and_ties():
+    est = P2Quantile(0.9)
+    for k in range(1000):
+        est.add(300 + k % 3)                            # integer kPa, heavy ties
+    assert 301 <= est.value() <= 302
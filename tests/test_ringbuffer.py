@@ -0,0 +1,159 @@
+# RingBuffer family: cursors, time search, running aggregates and duplicate folding, on the list ring, the array ring and SampleRing
+
+import random
+
+import pytest
+
+from ringbuffer import RingBuffer, NumericRingBuffer, SampleRing, DuplicateDetectingBuffer
+
+RINGS = (RingBuffer, NumericRingBuffer)
+
+def filled(cls, size, n):
+    """Ring of size with n adds: value k at timestamp 1000 + 10k"""
+    ring = cls(size)
+    for k in range(n):
+        ring.add(k, 1000 + 10 * k)
+    return ring
+
+@pytest.mark.parametrize("cls", RINGS)
+@pytest.mark.parametrize("n", (0, 1, 5, 8, 13, 21))
+def test_window_and_last(cls, n):
+    ring = filled(cls, 8, n)
+    live = list(range(max(0, n - 8), n))            # what the ring should still hold, oldest first
+    assert [v for _, v in ring.window()] == live
+    assert [v for _, v in ring.last()] == live[::-1]
+    for m in (0, 1, 3, 8, 20):
+        want = live[-m:] if m else []
+        win = ring.window(m)
+        assert list(win.values()) == want
+        assert list(win.times()) == [1000 + 10 * v for v in want]
+        assert list(ring.last(m).values()) == want[::-1]
+    if live:
+        assert ring.latest() == (1000 + 10 * live[-1], live[-1])
+        assert ring.last()[0] == ring.window()[-1] == ring.latest()
+    else:
+        assert ring.latest() is None
+
+@pytest.mark.parametrize("cls", RINGS)
+def test_window_slots_are_physical(cls):
+    ring = filled(cls, 5, 7)                        # wrapped: slots 0,1 hold the two newest
+    win = ring.window()
+    assert [win.slot(k) for k in range(len(win))] == [2, 3, 4, 0, 1]
+    assert [ring.buffer[win.slot(k)][1] for k in range(len(win))] == [2, 3, 4, 5, 6]
+    with pytest.raises(IndexError):
+        win[5]
+
+@pytest.mark.parametrize("n", (0, 3, 6, 15))
+def test_sample_ring(n):
+    ring = SampleRing(6)
+    for k in range(n):
+        ring.add(100 + k)
+    live = [100 + k for k in range(max(0, n - 6), n)]
+    assert list(ring.window()) == live
+    assert list(ring.last()) == live[::-1]
+    assert list(ring.window(2).values()) == live[-2:]
+    for k in range(len(live)):
+        assert ring.at_offset(k) == live[-1 - k]
+
+def brute_between(ring, t0, t1):
+    return [e for e in ring.window() if t0 <= e[0] <= t1]
+
+@pytest.mark.parametrize("cls", RINGS)
+@pytest.mark.parametrize("n", (0, 1, 4, 9, 23))    # empty, part full, exactly full, wrapped, wrapped again
+def test_since_between(cls, n):
+    ring = cls(9)
+    times = [1000 + 10 * (k // 3) for k in range(n)]    # runs of three equal timestamps
+    for k, ts in enumerate(times):
+        ring.add(k, ts)
+    lo = ring.window()[0][0] if n else 1000
+    hi = ring.latest()[0] if n else 1000
+    probes = range(lo - 15, hi + 16, 5)                 # before, between, on and past the stored times
+    for t0 in probes:
+        assert list(ring.since(t0)) == [e for e in ring.window() if e[0] >= t0]
+        for t1 in probes:
+            assert list(ring.between(t0, t1)) == brute_between(ring, t0, t1)
+
+@pytest.mark.parametrize("cls", RINGS)
+def test_bisect_equal_timestamps(cls):
+    ring = filled(cls, 6, 4)
+    for k in range(4, 10):
+        ring.add(k, 1050)                               # wraps... six equal timestamps fill the ring
+    assert ring._bisect(1050) == 0
+    assert ring._bisect(1050, right=True) == 6
+    assert len(ring.since(1051)) == 0
+    assert len(ring.between(1060, 1040)) == 0           # reversed range is empty, not negative
+    assert [v for _, v in ring.between(1050, 1050)] == [4, 5, 6, 7, 8, 9]
+
+@pytest.mark.parametrize("cls", RINGS)
+@pytest.mark.parametrize("resum_every", (None, 7))
+def test_aggregates(cls, resum_every):
+    rng = random.Random(4)
+    ring = cls(16, aggregate=True, resum_every=resum_every)
+    assert (ring.mean(), ring.variance(), ring.min(), ring.max()) == (0, 0, None, None)
+    for k in range(100):
+        ring.add(rng.randint(200, 700), 1000 + k)
+        vals = list(ring.window().values())
+        n = len(vals)
+        mean = sum(vals) / n
+        assert ring.mean() == pytest.approx(mean)
+        if n > 1:
+            assert ring.variance() == pytest.approx(sum((v - mean) ** 2 for v in vals) / (n - 1))
+        assert ring.min() == min(vals)
+        assert ring.max() == max(vals)
+
+@pytest.mark.parametrize("cls", RINGS)
+def test_resum(cls):
+    ring = filled(cls, 8, 20)
+    agg = cls(8, aggregate=True)
+    for k in range(20):
+        agg.add(k, 1000 + 10 * k)
+    agg._sum += 1000                                    # as if drift had crept in
+    agg._maxq.clear()
+    agg.resum()
+    assert agg.mean() == sum(range(12, 20)) / 8
+    assert (agg.min(), agg.max()) == (12, 19)
+    agg.add(3, 2000)                                    # deques still expire the right samples after a rebuild
+    assert (agg.min(), agg.max()) == (3, 19)
+    for what in (ring.mean, ring.variance, ring.min, ring.max, ring.resum):
+        with pytest.raises(ValueError):
+            what()
+
+def ddb_entries(ring):
+    return [(msg, count) for _, msg, count in ring.window()]
+
+def test_ddb_alternating_fold():
+    ring = DuplicateDetectingBuffer(10, time_limit=60)
+    for k, msg in enumerate("ABABAB"):
+        ring.add(msg, 1000 + k)
+    assert ddb_entries(ring) == [("A", 3), ("B", 3)]
+    assert ring.window()[0][0] == 1000                  # folded entries keep their first timestamp
+    assert ring.repeat_count == 3
+
+def test_ddb_overwritten_before_repeat():
+    ring = DuplicateDetectingBuffer(3, time_limit=60, recent_keys=8)
+    for k, msg in enumerate("ABCD"):                    # D overwrites A's slot
+        ring.add(msg, 1000 + k)
+    ring.add("A", 1010)                                 # still in the table, but its entry is gone
+    assert ddb_entries(ring) == [("C", 1), ("D", 1), ("A", 1)]
+    ring.add("C", 1011)                                 # C's entry survived... folds
+    assert ddb_entries(ring) == [("C", 2), ("D", 1), ("A", 1)]
+
+def test_ddb_recent_keys_eviction():
+    ring = DuplicateDetectingBuffer(20, time_limit=60, recent_keys=3)
+    for k, msg in enumerate("ABC"):
+        ring.add(msg, 1000 + k)
+    ring.add("A", 1003)                                 # A now most recently seen... B is the oldest row
+    ring.add("D", 1004)                                 # table full: B makes way
+    assert "B" not in ring._recent and len(ring._recent) == 3
+    ring.add("B", 1005)                                 # forgotten, so a new entry even though its old one is live
+    ring.add("A", 1006)
+    assert ddb_entries(ring) == [("A", 3), ("B", 1), ("C", 1), ("D", 1), ("B", 1)]
+
+def test_ddb_time_limit():
+    ring = DuplicateDetectingBuffer(10, time_limit=30)
+    ring.add("A", 1000)
+    ring.add("A", 1030)                                 # on the limit... folds
+    ring.add("A", 1060)                                 # limit runs from the last sighting, not the entry
+    ring.add("A", 1091)                                 # 31 s later: expired
+    assert ddb_entries(ring) == [("A", 3), ("A", 1)]
+    assert ring.window()[1][0] == 1091
@@ -0,0 +1,50 @@
+# RoundRobinArchive: minute and hourly rollover, count-weighted hourly means, tier selection and footprint
+
+from rrd import RoundRobinArchive
+
+T0 = 1762484400                     # on an hour boundary
+
+def test_minute_rollover():
+    rrd = RoundRobinArchive(minute_size=10, hour_size=4)
+    for s in range(60):
+        rrd.add(300 + s % 7, T0 + s)
+    assert len(rrd.minutes) == 0                        # a period only shows once it closes
+    rrd.add(500, T0 + 60)
+    assert list(rrd.minutes.window()) == [(T0, 300, round(sum(300 + s % 7 for s in range(60)) / 60), 306)]
+    rrd.add(200, T0 + 185)                              # skips two minutes... no empty entries for them
+    assert [e[0] for e in rrd.minutes.window()] == [T0, T0 + 60]
+    assert rrd.minutes.latest() == (T0 + 60, 500, 500, 500)
+
+def test_hour_weighted_by_samples():
+    rrd = RoundRobinArchive(minute_size=120, hour_size=4)
+    for s in range(60):
+        rrd.add(100, T0 + s)                            # 60 samples in the first minute...
+    rrd.add(400, T0 + 60)                               # ... one in the second
+    rrd.add(250, T0 + 3600)                             # next hour: closes minute 2...
+    assert [e[2] for e in rrd.minutes.window()] == [100, 400]
+    assert len(rrd.hours) == 0
+    rrd.add(250, T0 + 3660)                             # ... the hour closes when the next hour's first minute does
+    assert list(rrd.hours.window()) == [(T0, 100, round(6400 / 61), 400)]      # not the mean of the minute means
+
+def test_hour_rollover_and_wrap():
+    rrd = RoundRobinArchive(minute_size=5, hour_size=3)
+    for h in range(6):
+        for m in range(0, 60, 10):
+            rrd.add(10 * h + m // 10, T0 + 3600 * h + 60 * m)
+    rrd.add(0, T0 + 3600 * 6)
+    rrd.add(0, T0 + 3600 * 6 + 60)
+    assert [e[0] for e in rrd.hours.window()] == [T0 + 3600 * h for h in (3, 4, 5)]
+    assert [e[1:] for e in rrd.hours.window()] == [(10 * h, 10 * h + 3, 10 * h + 5) for h in (3, 4, 5)]    # mean of 0..5 rounds half up
+    assert len(rrd.minutes) == 5
+    assert rrd.minutes.latest()[0] == T0 + 3600 * 6
+
+def test_select_and_footprint():
+    rrd = RoundRobinArchive(minute_size=240, hour_size=168)
+    assert rrd.raw is None and rrd.tiers() == (rrd.minutes, rrd.hours)
+    assert rrd.select(4 * 3600) is rrd.minutes
+    assert rrd.select(4 * 3600 + 1) is rrd.hours
+    assert rrd.select(30 * 86400) is rrd.hours          # nothing spans it... coarsest
+    assert rrd.footprint() == (240 + 168) * (4 + 3 * 2)
+    raw = RoundRobinArchive(raw_size=100, minute_size=10, hour_size=10)
+    assert raw.select(100) is raw.raw and raw.select(101) is raw.minutes
+    assert raw.footprint() == 100 * 6 + 20 * 10
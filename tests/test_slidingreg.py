@@ -0,0 +1,56 @@
+# SlidingRegression (O(1) slide) against linear_regression(..., dummy_x=True) over the same window
+
+import random
+
+import pytest
+
+import stats
+from stats import SlidingRegression, linear_regression
+
+@pytest.fixture(autouse=True)
+def loop_path(monkeypatch):
+    monkeypatch.setattr(stats, "VECTOR_MIN_LINREG", 1 << 30)
+
+def check(reg, ys):
+    m = min(len(ys), reg.n)
+    last = ys[-m:]
+    ref = linear_regression(last, last, m, m, m, True)
+    got = reg.result()
+    for k in (0, 1, 2, 4):
+        assert got[k] == pytest.approx(ref[k], rel=1e-9, abs=1e-9), (len(ys), k)
+    assert abs(got[3] ** 2 - ref[3] ** 2) <= 1e-9 * max(1.0, ref[2] ** 2), len(ys)
+
+@pytest.mark.parametrize("n", (2, 7, 30))
+@pytest.mark.parametrize("kind", ("int", "float"))
+def test_matches_linear_regression(n, kind):
+    rng = random.Random(11)
+    reg = SlidingRegression(n)
+    ys = []
+    for i in range(5 * n + 3):                          # fill, then wrap several times... floats go through resum
+        y = 350 - i * 0.3 + rng.gauss(0, 4)
+        y = int(y) if kind == "int" else y
+        reg.add(y)
+        ys.append(y)
+        assert len(reg) == min(len(ys), n)
+        if len(ys) >= 2:
+            check(reg, ys)
+
+def test_resum_restores_sums():
+    reg = SlidingRegression(8)
+    ys = [300 + (k * 7) % 11 for k in range(13)]
+    for y in ys:
+        reg.add(y)
+    exact = (reg.sum_y, reg.sum_yy, reg.sum_xy)
+    reg.sum_y += 0.5                                    # as if float drift had crept in
+    reg.sum_xy -= 3.25
+    reg.resum()
+    assert (reg.sum_y, reg.sum_yy, reg.sum_xy) == exact
+    check(reg, ys)
+
+def test_bad_args():
+    with pytest.raises(ValueError):
+        SlidingRegression(1)
+    reg = SlidingRegression(4)
+    reg.add(300)
+    with pytest.raises(ValueError):
+        reg.result()
@@ -0,0 +1,85 @@
+# Snapshot save/load: round trip of every ring kind, and a bad or stale file leaving the rings empty
+
+import time
+
+import pytest
+
+import snapshot
+from ringbuffer import RingBuffer, NumericRingBuffer, DuplicateDetectingBuffer, SampleRing
+
+MAX_AGE = 1800
+
+def make_rings():
+    return [DuplicateDetectingBuffer(6, time_limit=60), RingBuffer(5), NumericRingBuffer(8, typecode='h'), SampleRing(10)]
+
+def filled():
+    events, errors, depths, kpa = make_rings()
+    for k, msg in enumerate("ABABCA"):
+        events.add(f"event {msg}", 1000 + k)           # folds to A x3, B x2, C
+    for k in range(7):
+        errors.add(k * 1.5 if k % 2 else k, 2000 + k)     # wraps... ints and floats
+    for k in range(11):
+        depths.add(-40 + 9 * k, 3000 + k)
+    for k in range(13):
+        kpa.add(300 + k)
+    return [events, errors, depths, kpa], [([7, 8, 9, 10], 2)]
+
+def contents(rings):
+    events, errors, depths, kpa = rings
+    return list(events.window()), list(errors.window()), list(depths.window()), list(kpa.window()), kpa.index
+
+@pytest.fixture
+def snap(tmp_path):
+    return str(tmp_path / "rings.snap")
+
+def test_round_trip(snap):
+    rings, samples = filled()
+    assert snapshot.save(snap, rings, samples) > 0
+    fresh, fresh_samples = make_rings(), [([0] * 4, 0)]
+    assert snapshot.load(snap, fresh, fresh_samples, MAX_AGE) == [2]
+    assert contents(fresh) == contents(rings)
+    assert [c for _, _, c in fresh[0].window()] == [3, 2, 1]
+    assert fresh_samples[0][0] == [7, 8, 9, 10]
+    fresh[0].add("event A", 1010)                       # restored entries don't fold... the recent table starts empty
+    assert len(fresh[0]) == 4
+
+def test_truncated_leaves_rings_empty(snap):
+    rings, samples = filled()
+    snapshot.save(snap, rings, samples)
+    with open(snap, 'rb') as f:
+        data = f.read()
+    for cut in (5, 12, len(data) // 2, len(data) - 3):
+        with open(snap, 'wb') as f:
+            f.write(data[:cut])
+        fresh = make_rings()
+        assert snapshot.load(snap, fresh, [([0] * 4, 0)], MAX_AGE) is None, cut
+        assert all(len(r) == 0 for r in fresh), cut
+
+def test_shape_mismatch(snap):
+    rings, samples = filled()
+    snapshot.save(snap, rings, samples)
+    assert snapshot.load(snap, make_rings()[:3], [([0] * 4, 0)], MAX_AGE) is None
+    assert snapshot.load(snap, make_rings(), [], MAX_AGE) is None
+    fresh, short = make_rings(), [([0] * 3, 0)]     # a sample list that changed size comes back empty, the rest restore
+    assert snapshot.load(snap, fresh, short, MAX_AGE) == [0]
+    assert short[0][0] == [0, 0, 0] and len(fresh[2]) == 8
+
+def test_age_and_future(snap, monkeypatch):
+    rings, samples = filled()
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    snapshot.save(snap, rings, samples)
+    for offset, ok in ((MAX_AGE - 5, True), (MAX_AGE + 5, False), (-60, False)):     # -60: saved "in the future"
+        monkeypatch.setattr(time, "time", lambda: now + offset)
+        fresh = make_rings()
+        assert (snapshot.load(snap, fresh, [([0] * 4, 0)], MAX_AGE) is not None) == ok, offset
+        assert (len(fresh[1]) > 0) == ok
+
+def test_missing_file(snap):
+    assert snapshot.load(snap, make_rings(), [], MAX_AGE) is None
+
+def test_bug_is_not_swallowed(snap):
+    rings, samples = filled()
+    snapshot.save(snap, rings, samples)
+    with pytest.raises(AttributeError):                 # not a bad file... the caller should hear about it
+        snapshot.load(snap, make_rings()[:3] + [object()], [([0] * 4, 0)], MAX_AGE)
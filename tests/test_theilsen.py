@@ -0,0 +1,53 @@
+# Theil-Sen fit for the depth residual SD check: agrees with least squares on clean data, shrugs off one glitch
+
+import random
+
+import pytest
+
+from stats import linear_regression, theil_sen
+
+DEPTHRINGSIZE = 12
+DEPTH_SD_MAX  = 3
+
+def depth_window(rng, n, glitch=False):
+    """Tank filling at ~0.7 mm/s, 15 s apart, ±1 mm noise... optionally one VL53L1X glitch"""
+    x = [15 * i + rng.randint(0, 1) for i in range(n)]
+    y = [1000 + int(0.7 * x[i]) + rng.randint(-1, 1) for i in range(n)]
+    if glitch:
+        y[rng.randrange(n)] += rng.choice((-1, 1)) * rng.randint(40, 200)
+    return x, y
+
+def test_clean_matches_least_squares():
+    rng = random.Random(21)
+    for _ in range(300):
+        x, y = depth_window(rng, DEPTHRINGSIZE)
+        ls = linear_regression(x, y, DEPTHRINGSIZE, 0, DEPTHRINGSIZE, False)
+        ts = theil_sen(x, y, DEPTHRINGSIZE, 0, DEPTHRINGSIZE, False)
+        assert ts[0] == pytest.approx(ls[0], abs=0.02)
+        assert ts[2] < DEPTH_SD_MAX
+
+def test_one_glitch():
+    rng = random.Random(21)
+    trips_ls = trips_ts = 0
+    for _ in range(300):
+        x, y = depth_window(rng, DEPTHRINGSIZE, glitch=True)
+        sd_ls = linear_regression(x, y, DEPTHRINGSIZE, 0, DEPTHRINGSIZE, False)[3]
+        slope, _, sd_ts = theil_sen(x, y, DEPTHRINGSIZE, 0, DEPTHRINGSIZE, False)
+        assert slope == pytest.approx(0.7, abs=0.05)           # the glitch doesn't move the robust slope
+        trips_ls += sd_ls > DEPTH_SD_MAX
+        trips_ts += sd_ts > DEPTH_SD_MAX
+    assert trips_ts == 0 and trips_ls > 250
+
+def test_ring_addressing():
+    """Same window read from a wrapped ring as from a straight list"""
+    rng = random.Random(21)
+    x, y = depth_window(rng, DEPTHRINGSIZE)
+    k = 5
+    xr, yr = x[-k:] + x[:-k], y[-k:] + y[:-k]                  # oldest entry now at index k
+    assert theil_sen(xr, yr, DEPTHRINGSIZE, k, DEPTHRINGSIZE, False) == theil_sen(x, y, DEPTHRINGSIZE, 0, DEPTHRINGSIZE, False)
+
+def test_flat_and_bad_count():
+    flat = [500] * DEPTHRINGSIZE
+    assert theil_sen(list(range(DEPTHRINGSIZE)), flat, DEPTHRINGSIZE, 5, DEPTHRINGSIZE, False) == (0, 500, 0)
+    with pytest.raises(ValueError):
+        theil_sen(flat, flat, 1, 0, DEPTHRINGSIZE, False)
@@ -0,0 +1,49 @@
+# ulab/numpy vector paths against the pure-Python loops... same answers either side of the VECTOR_MIN_* crossovers
+
+import random
+
+import pytest
+
+import stats
+from stats import mean_stddev, linear_regression, ring_mean
+
+RINGLEN = 1024
+THRESHOLDS = ("VECTOR_MIN_MEAN", "VECTOR_MIN_STDDEV", "VECTOR_MIN_LINREG")
+
+pytestmark = pytest.mark.skipif(stats.np is None, reason="no numpy/ulab... loops only")
+
+def both(monkeypatch, fn, *args):
+    for name in THRESHOLDS:
+        monkeypatch.setattr(stats, name, 1 << 30)
+    a = fn(*args)
+    for name in THRESHOLDS:
+        monkeypatch.setattr(stats, name, 0)
+    return a, fn(*args)
+
+def test_vector_matches_loop(monkeypatch):
+    rng = random.Random(14)
+    for _ in range(200):
+        y = [rng.randint(0, 700) for _ in range(RINGLEN)]
+        x = [5 * i + rng.randint(0, 3) for i in range(RINGLEN)]
+        n = rng.choice((2, 3, 12, 60, 128, 1024))
+        start = rng.randrange(RINGLEN)                         # wrapped windows too... two slices
+        a, b = both(monkeypatch, ring_mean, y, n, start, RINGLEN)
+        assert b == pytest.approx(a, rel=1e-9), (n, start)
+        a, b = both(monkeypatch, mean_stddev, y, n, start, RINGLEN)
+        assert b == pytest.approx(a, rel=1e-9, abs=1e-9), (n, start)
+        for dummy in (True, False):
+            a, b = both(monkeypatch, linear_regression, x, y, n, start, RINGLEN, dummy)
+            for k in (0, 1, 2, 4):
+                assert b[k] == pytest.approx(a[k], rel=1e-8, abs=1e-8), (n, dummy, start)
+            assert abs(a[3] ** 2 - b[3] ** 2) < 1e-8 * max(1, a[2] ** 2), (n, dummy, start)
+
+def test_thresholds_route_by_kernel(monkeypatch):
+    """Below its own crossover each kernel stays on the loop, whatever the others are set to"""
+    calls = []
+    monkeypatch.setattr(stats, "_ring_vector", lambda *a: calls.append(a) or stats.np.zeros(1))
+    y = list(range(RINGLEN))
+    ring_mean(y, stats.VECTOR_MIN_MEAN - 1, 0, RINGLEN)
+    mean_stddev(y, stats.VECTOR_MIN_STDDEV - 1, 0, RINGLEN)
+    assert calls == []
+    ring_mean(y, stats.VECTOR_MIN_MEAN, 0, RINGLEN)
+    assert len(calls) == 1